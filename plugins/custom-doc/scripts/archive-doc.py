@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+ドキュメントアーカイブスクリプト
+長期間更新されていないドキュメントを1つの圧縮アーカイブにまとめ、
+一覧・検索・読み込み・復元を行う
+"""
+
+import argparse
+import re
+import shutil
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import doc_store
+
+
+# アーカイブ対象とする最終更新からの経過日数（デフォルト）
+DEFAULT_STALE_DAYS = 90
+
+
+def last_modified(doc_dir: Path) -> float:
+    """ドキュメントディレクトリ内の最終更新時刻"""
+    mtimes = [p.stat().st_mtime for p in doc_dir.rglob('*') if p.is_file()]
+    return max(mtimes, default=doc_dir.stat().st_mtime)
+
+
+def describe_document(doc_dir: Path) -> dict:
+    """アーカイブのインデックスに記録する情報（一覧・検索はこの情報のみで行う）"""
+    # ロックや変換記録などの隠しファイルはアーカイブしない
+    files = sorted(
+        p.relative_to(doc_dir).as_posix() for p in doc_dir.rglob('*')
+        if p.is_file() and not any(part.startswith('.') for part in p.relative_to(doc_dir).parts)
+    )
+    title = doc_dir.name
+    summary = ''
+    headings = []
+
+    for filename in files:
+        if not filename.endswith('.md'):
+            continue
+        content = (doc_dir / filename).read_text(encoding='utf-8')
+        title_match = re.search(r'^#\s+(.+)$', content, re.MULTILINE)
+        if title_match and title == doc_dir.name:
+            title = title_match.group(1).strip()
+        summary = summary or doc_store.extract_summary(content)
+        headings += re.findall(r'^#{2,3}\s+(.+)$', content, re.MULTILINE)
+
+    return {
+        'files': files,
+        'title': title,
+        'summary': summary,
+        'headings': headings,
+        'last_modified': datetime.fromtimestamp(last_modified(doc_dir), timezone.utc).strftime('%Y-%m-%d'),
+    }
+
+
+def archive_documents(base_dir: Path, names, days: int, dry_run: bool) -> int:
+    """古いドキュメント（または指定ドキュメント）をアーカイブに移動"""
+    # 名前の検証はロックの取得や読み書き・削除より前に行う
+    try:
+        named = [doc_store.document_path(base_dir, name) for name in names]
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    with doc_store.file_lock(base_dir / doc_store.LOCK_FILE_NAME):
+        if names:
+            targets = named
+            missing = [t.name for t in targets if not doc_store.is_document_dir(t)]
+            if missing:
+                print(f"Error: ドキュメントが見つかりません: {', '.join(missing)}", file=sys.stderr)
+                return 1
+        else:
+            threshold = time.time() - days * 86400
+            targets = sorted(
+                d for d in base_dir.iterdir()
+                if doc_store.is_document_dir(d) and last_modified(d) < threshold
+            )
+
+        # 同名のドキュメントが既にアーカイブにある場合、古い方を失わないよう対象にしない
+        documents = doc_store.load_archive_index(base_dir)
+        archived = [t.name for t in targets if t.name in documents]
+        if archived and names:
+            print(f"Error: 同名のドキュメントが既にアーカイブにあります: {', '.join(archived)}", file=sys.stderr)
+            return 1
+        for name in archived:
+            print(f"Skipping {name}（同名のドキュメントが既にアーカイブにあります）", file=sys.stderr)
+        targets = [t for t in targets if t.name not in documents]
+
+        if not targets:
+            print("アーカイブ対象のドキュメントはありません。", file=sys.stderr)
+            return 0
+
+        for doc_dir in targets:
+            print(f"Archiving {doc_dir.name}", file=sys.stderr)
+        if dry_run:
+            return 0
+
+        entries = {}
+        for doc_dir in targets:
+            info = describe_document(doc_dir)
+            for filename in info['files']:
+                entries[f'{doc_dir.name}/{filename}'] = (doc_dir / filename).read_bytes()
+            documents[doc_dir.name] = info
+
+        # アーカイブとインデックスを書き終えてから元のディレクトリを削除する
+        doc_store.rewrite_archive(base_dir, entries, [f'{d.name}/' for d in targets])
+        doc_store.save_archive_index(base_dir, documents)
+        for doc_dir in targets:
+            shutil.rmtree(doc_dir)
+
+    print(f"✓ {len(targets)} 件をアーカイブしました", file=sys.stderr)
+    return 0
+
+
+def list_archived(base_dir: Path, keyword) -> int:
+    """アーカイブ済みドキュメントを一覧表示"""
+    documents = doc_store.load_archive_index(base_dir)
+    for name in sorted(documents):
+        entry = documents[name]
+        if keyword and not doc_store.archive_entry_matches(name, entry, keyword):
+            continue
+        print(f"{name}\t{entry.get('last_modified', '')}\t{entry.get('title', '')}")
+    return 0
+
+
+def show_archived(base_dir: Path, name: str) -> int:
+    """アーカイブ済みドキュメントのマークダウンを展開せずに出力"""
+    documents = doc_store.load_archive_index(base_dir)
+    if name not in documents:
+        print(f"Error: アーカイブにドキュメントがありません: {name}", file=sys.stderr)
+        return 1
+
+    for filename in documents[name]['files']:
+        if filename.endswith('.md'):
+            print(doc_store.read_archived_file(base_dir, name, filename))
+    return 0
+
+
+def restore_archived(base_dir: Path, name: str) -> int:
+    """アーカイブ済みドキュメントを通常のディレクトリに戻す"""
+    try:
+        doc_dir = doc_store.restore_archived_document(base_dir, name)
+    except (ValueError, FileExistsError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    except KeyError:
+        print(f"Error: アーカイブにドキュメントがありません: {name}", file=sys.stderr)
+        return 1
+
+    print(f"✓ {doc_dir.name} を復元しました", file=sys.stderr)
+    return 0
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='古いドキュメントのアーカイブ・参照・復元')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    archive_parser = subparsers.add_parser('archive', help='古いドキュメントをアーカイブに移動')
+    archive_parser.add_argument('names', nargs='*', help='アーカイブするドキュメント名（省略時は --days で判定）')
+    archive_parser.add_argument('--days', type=int, default=DEFAULT_STALE_DAYS,
+                                help=f'最終更新からこの日数以上経過したものを対象にする（デフォルト: {DEFAULT_STALE_DAYS}）')
+    archive_parser.add_argument('--dry-run', action='store_true', help='対象の表示のみ行う')
+
+    list_parser = subparsers.add_parser('list', help='アーカイブ済みドキュメントを一覧表示')
+    list_parser.add_argument('keyword', nargs='?', help='名前・タイトル・概要・見出しで絞り込み')
+
+    show_parser = subparsers.add_parser('show', help='アーカイブ済みドキュメントの内容を出力')
+    show_parser.add_argument('name')
+
+    restore_parser = subparsers.add_parser('restore', help='アーカイブ済みドキュメントを復元')
+    restore_parser.add_argument('name')
+
+    args = parser.parse_args()
+
+    base_dir = doc_store.find_documents_dir()
+    if not base_dir:
+        print("Error: .claude/custom-documents/ が見つかりません", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == 'archive':
+        sys.exit(archive_documents(base_dir, args.names, args.days, args.dry_run))
+    elif args.command == 'list':
+        sys.exit(list_archived(base_dir, args.keyword))
+    elif args.command == 'show':
+        sys.exit(show_archived(base_dir, args.name))
+    elif args.command == 'restore':
+        sys.exit(restore_archived(base_dir, args.name))
+
+
+if __name__ == "__main__":
+    main()
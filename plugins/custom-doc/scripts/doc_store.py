@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+ドキュメントストア共通処理
+worktree間で共有するストアの解決、ファイルロック、アトミックな書き込みを提供
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# 共有ストアを有効にする環境変数（1/true/yes で有効）
+SHARED_STORE_ENV = 'CUSTOM_DOC_SHARED_STORE'
+
+# git common dir 配下に作成する共有ストアのディレクトリ名
+SHARED_STORE_NAME = 'custom-documents'
+
+# worktree内のドキュメントルート（共有ストア無効時）と、上位ディレクトリを探す階層数
+DOCUMENTS_DIR = Path('.claude') / 'custom-documents'
+DOCUMENTS_DIR_SEARCH_DEPTH = 5
+
+# ストア単位の排他ロックに使うファイル
+LOCK_FILE_NAME = '.lock'
+
+# 横断検索インデックスの出力先（ドキュメントではないディレクトリ）
+SEARCH_INDEX_DIR = 'search-index'
+
+# 変換済みファイルの記録（worktree間で変換を重複させないため）
+BUILD_STATE_FILE_NAME = '.build-state.json'
+
+# 古いドキュメントをまとめるアーカイブ（zip本体と一覧用のインデックス）
+ARCHIVE_DIR_NAME = '.archive'
+ARCHIVE_FILE_NAME = 'documents.zip'
+ARCHIVE_INDEX_FILE_NAME = 'index.json'
+
+
+def is_document_dir(path: Path) -> bool:
+    """ストア直下のディレクトリがドキュメントかどうか（インデックスや隠しディレクトリを除外）"""
+    return path.is_dir() and not path.name.startswith('.') and path.name != SEARCH_INDEX_DIR
+
+
+def document_path(base_dir: Path, name: str) -> Path:
+    """
+    ドキュメント名からストア直下のパスを求める
+    区切り文字や '..' を含むなど、ストア直下以外を指す名前は ValueError
+    """
+    path = base_dir / name
+    if (not name or name.startswith('.') or '/' in name or '\\' in name
+            or path.resolve().parent != base_dir.resolve()):
+        raise ValueError(f'不正なドキュメント名です: {name}')
+    return path
+
+
+def contained_path(base: Path, relative: str) -> Path:
+    """base 配下の相対パスを求める（base の外を指す場合は ValueError）"""
+    path = base / relative
+    if not path.resolve().is_relative_to(base.resolve()):
+        raise ValueError(f'不正なファイル名です: {relative}')
+    return path
+
+
+def git_common_dir(cwd: Optional[Path] = None) -> Optional[Path]:
+    """git rev-parse --git-common-dir の結果を絶対パスで取得"""
+    cwd = cwd or Path.cwd()
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--git-common-dir'],
+            cwd=cwd, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    common_dir = Path(result.stdout.strip())
+    if not common_dir.is_absolute():
+        common_dir = cwd / common_dir
+    return common_dir.resolve()
+
+
+def shared_store_enabled() -> bool:
+    """環境変数で共有ストアが有効化されているか"""
+    return os.environ.get(SHARED_STORE_ENV, '').lower() in ('1', 'true', 'yes')
+
+
+def shared_store_dir(create: bool = True) -> Optional[Path]:
+    """全worktreeで共有するストア（<git common dir>/custom-documents）を取得"""
+    common_dir = git_common_dir()
+    if common_dir is None:
+        return None
+
+    store = common_dir / SHARED_STORE_NAME
+    if create:
+        store.mkdir(parents=True, exist_ok=True)
+    return store
+
+
+def find_documents_dir(create: bool = False) -> Optional[Path]:
+    """
+    ドキュメントルートを取得
+    共有ストア有効時は <git common dir>/custom-documents、それ以外は上位ディレクトリの .claude/custom-documents。
+    見つからない場合、create=True ならカレントディレクトリに作成する
+    """
+    if shared_store_enabled():
+        return shared_store_dir(create=create)
+
+    current = Path.cwd()
+    for _ in range(DOCUMENTS_DIR_SEARCH_DEPTH):
+        candidate = current / DOCUMENTS_DIR
+        if candidate.is_dir():
+            return candidate
+        if current.parent == current:
+            break
+        current = current.parent
+
+    if create:
+        candidate = Path.cwd() / DOCUMENTS_DIR
+        candidate.mkdir(parents=True, exist_ok=True)
+        return candidate
+    return None
+
+
+def store_root_of(path: Path) -> Optional[Path]:
+    """
+    パスを含むドキュメントルート（ストア外のパスならNone）
+    カレントディレクトリから見つかるルートに加え、パス自体に含まれる .claude/custom-documents も判定する
+    """
+    path = path.resolve()
+    root = find_documents_dir()
+    if root is not None:
+        root = root.resolve()
+        if path == root or root in path.parents:
+            return root
+
+    for candidate in (path, *path.parents):
+        if candidate.parent.name == DOCUMENTS_DIR.parent.name and candidate.name == DOCUMENTS_DIR.name:
+            return candidate
+    return None
+
+
+@contextlib.contextmanager
+def file_lock(lock_path: Path) -> Iterator[None]:
+    """
+    ファイルロックによる排他制御
+    fcntl が使えない環境ではロックせずに実行する
+    """
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write_bytes(path: Path, data: bytes) -> None:
+    """同じディレクトリの一時ファイルに書いてからrenameし、読み手に書きかけのファイルを見せない"""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(tmp_name)
+        raise
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    """テキストをUTF-8でアトミックに書き込み"""
+    atomic_write_bytes(path, text.encode('utf-8'))
+
+
+def load_build_state(doc_root: Path) -> Dict:
+    """変換済みファイルの記録を読み込み（壊れている場合は空として扱う）"""
+    try:
+        with open(doc_root / BUILD_STATE_FILE_NAME, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def save_build_state(doc_root: Path, state: Dict) -> None:
+    """変換済みファイルの記録を保存"""
+    atomic_write_text(
+        doc_root / BUILD_STATE_FILE_NAME,
+        json.dumps(state, ensure_ascii=False, sort_keys=True, indent=2) + '\n'
+    )
+
+
+# pre-compact-doc-hook の write-context-snapshot.py に同じ実装を複製している（別プラグインのため）
+def extract_summary(markdown_content: str) -> str:
+    """「概要」セクションの本文をプレーンテキストとして抽出"""
+    match = re.search(r'^##\s+概要\s*$(.*?)(?=^#{1,3}\s|\Z)', markdown_content, re.MULTILINE | re.DOTALL)
+    if not match:
+        return ''
+
+    text = re.sub(r'```.*?```', ' ', match.group(1), flags=re.DOTALL)
+    text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
+    text = re.sub(r'[`*_>#-]', ' ', text)
+    return ' '.join(text.split())
+
+
+def load_archive_index(base_dir: Path) -> Dict[str, Dict]:
+    """アーカイブ済みドキュメントの一覧（zipを開かずに参照できる）"""
+    try:
+        with open(base_dir / ARCHIVE_DIR_NAME / ARCHIVE_INDEX_FILE_NAME, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return index.get('documents', {}) if isinstance(index, dict) else {}
+
+
+def save_archive_index(base_dir: Path, documents: Dict[str, Dict]) -> None:
+    """アーカイブ済みドキュメントの一覧を保存"""
+    atomic_write_text(
+        base_dir / ARCHIVE_DIR_NAME / ARCHIVE_INDEX_FILE_NAME,
+        json.dumps({'version': 1, 'documents': documents}, ensure_ascii=False, sort_keys=True, indent=2) + '\n'
+    )
+
+
+def archive_entry_matches(name: str, entry: Dict, keyword: str) -> bool:
+    """アーカイブ済みドキュメントが名前・タイトル・概要・見出しのいずれかでキーワードに一致するか"""
+    haystack = ' '.join([name, entry.get('title', ''), entry.get('summary', '')] + entry.get('headings', []))
+    return keyword.lower() in haystack.lower()
+
+
+def read_archived_bytes(base_dir: Path, name: str, filename: str) -> bytes:
+    """アーカイブ内のファイルを展開せずに読み込み（zipの中央ディレクトリから直接参照）"""
+    with zipfile.ZipFile(base_dir / ARCHIVE_DIR_NAME / ARCHIVE_FILE_NAME) as archive:
+        return archive.read(f'{name}/{filename}')
+
+
+def read_archived_file(base_dir: Path, name: str, filename: str) -> str:
+    """アーカイブ内のテキストファイルを読み込み"""
+    return read_archived_bytes(base_dir, name, filename).decode('utf-8')
+
+
+def rewrite_archive(base_dir: Path, add: Dict[str, bytes], remove_prefixes: List[str]) -> None:
+    """
+    アーカイブを書き換え（エントリの追加と、指定ドキュメントの削除）
+    全エントリを読み直して作り直すが、アーカイブ・復元は稀な操作のため許容する
+    """
+    archive_path = base_dir / ARCHIVE_DIR_NAME / ARCHIVE_FILE_NAME
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+
+    entries: Dict[str, bytes] = {}
+    if archive_path.exists():
+        with zipfile.ZipFile(archive_path) as archive:
+            for entry_name in archive.namelist():
+                if not any(entry_name.startswith(prefix) for prefix in remove_prefixes):
+                    entries[entry_name] = archive.read(entry_name)
+    entries.update(add)
+
+    raw = io.BytesIO()
+    with zipfile.ZipFile(raw, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+        for entry_name in sorted(entries):
+            archive.writestr(entry_name, entries[entry_name])
+    atomic_write_bytes(archive_path, raw.getvalue())
+
+
+def restore_archived_document(base_dir: Path, name: str) -> Path:
+    """
+    アーカイブからドキュメントを展開して通常のディレクトリに戻す
+    不正な名前は ValueError、アーカイブに無い名前は KeyError、
+    同名のドキュメントが既にある場合は上書きせず FileExistsError
+    """
+    doc_dir = document_path(base_dir, name)
+    with file_lock(base_dir / LOCK_FILE_NAME):
+        documents = load_archive_index(base_dir)
+        if name not in documents:
+            raise KeyError(name)
+        if doc_dir.exists():
+            raise FileExistsError(f'既に同名のディレクトリが存在します: {name}')
+
+        # インデックスのファイル名も書き込み前に全て検証する
+        targets = [(filename, contained_path(doc_dir, filename)) for filename in documents[name]['files']]
+        doc_dir.mkdir(exist_ok=True)
+        for filename, target in targets:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_bytes(target, read_archived_bytes(base_dir, name, filename))
+
+        rewrite_archive(base_dir, {}, [f'{name}/'])
+        del documents[name]
+        save_archive_index(base_dir, documents)
+
+    return doc_dir
+
+
+def main():
+    """ドキュメントルートのパスを出力（コマンド・スキルから保存先を決めるために使用）"""
+    parser = argparse.ArgumentParser(description='ドキュメントストアのパスを取得')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    root_parser = subparsers.add_parser('root', help='ドキュメントルートのパスを出力')
+    root_parser.add_argument('--create', action='store_true', help='存在しなければ作成する')
+    args = parser.parse_args()
+
+    if args.command == 'root':
+        root = find_documents_dir(create=args.create)
+        if root is None:
+            print(f"Error: {DOCUMENTS_DIR}/ が見つかりません", file=sys.stderr)
+            sys.exit(1)
+        print(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,10 +4,44 @@
 目次、コピー機能、トグル展開機能を備えたHTMLを生成
 """
 
+import argparse
+import contextlib
+import gzip
+import hashlib
+import io
+import json
+import math
 import re
 import sys
+import zipfile
 from pathlib import Path
-from typing import List, Tuple, Dict
+from typing import Dict, List, Optional, Tuple
+
+import doc_store
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# 概要の表示用に保持する最大文字数
+SUMMARY_MAX_LENGTH = 160
+
+# 一覧情報（タイトル・パス・概要）を分割するドキュメント数。検索結果に表示する分だけ読み込む
+SEARCH_DOCS_CHUNK_SIZE = 256
+
+# 事前圧縮ファイル・バンドルに記録する固定タイムスタンプ（再現可能なビルドのため）
+BUNDLE_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+# 事前圧縮の対象とする拡張子
+PRECOMPRESS_SUFFIXES = ('.html', '.js')
+
+# CJK（ひらがな・カタカナ・漢字・半角カナ）の連続と英数字の単語を切り出す
+SEARCH_TOKEN_PATTERN = re.compile(
+    r'([\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f]+)'
+    r'|([0-9a-z_]+)'
+)
 
 
 def extract_headings(markdown_content: str) -> List[Tuple[int, str, str]]:
@@ -706,47 +740,719 @@ def convert_markdown_to_html(markdown_file: Path, output_file: Path = None) -> P
     if output_file is None:
         output_file = markdown_file.with_suffix('.html')
 
-    # HTMLを書き込み
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(final_html)
+    # HTMLを書き込み（並行ビルドで書きかけを読まれないようアトミックに置き換え）
+    doc_store.atomic_write_text(output_file, final_html)
 
     return output_file
 
 
+def tokenize_for_search(text: str) -> List[str]:
+    """
+    検索用にテキストをトークン化
+    英数字は単語単位、CJKは文字bi-gram（1文字のみの場合はuni-gram）に分割
+    """
+    tokens = []
+    for cjk, word in SEARCH_TOKEN_PATTERN.findall(text.lower()):
+        if cjk:
+            if len(cjk) == 1:
+                tokens.append(cjk)
+            else:
+                tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+        elif word:
+            tokens.append(word)
+    return tokens
+
+
+def search_shard_of(token: str, shard_count: int) -> int:
+    """トークンの格納シャード番号（FNV-1a、ブラウザ側の実装と一致させる）"""
+    h = 0x811c9dc5
+    for ch in token:
+        h ^= ord(ch)
+        h = (h * 0x01000193) & 0xffffffff
+    return h % shard_count
+
+
+def decide_shard_count(doc_count: int) -> int:
+    """ドキュメント数に応じたシャード数（64件ごとに倍、最大256）"""
+    if doc_count <= 64:
+        return 1
+    return min(256, 2 ** math.ceil(math.log2(doc_count / 64)))
+
+
+def collect_search_entry(markdown_file: Path, doc_root: Path) -> Dict:
+    """1ドキュメント分の検索対象情報を収集"""
+    with open(markdown_file, 'r', encoding='utf-8') as f:
+        markdown_content = f.read()
+
+    title_match = re.search(r'^#\s+(.+)$', markdown_content, re.MULTILINE)
+    title = title_match.group(1).strip() if title_match else markdown_file.stem
+    headings = [text for _, _, text in extract_headings(markdown_content)]
+    summary = doc_store.extract_summary(markdown_content)
+    path = markdown_file.with_suffix('.html').relative_to(doc_root).as_posix()
+
+    return {
+        'title': title,
+        'path': path,
+        'summary': summary,
+        'tokens': tokenize_for_search(' '.join([title, path, summary] + headings)),
+        'title_tokens': tokenize_for_search(title),
+    }
+
+
+def collect_archived_entries(doc_root: Path) -> List[Dict]:
+    """アーカイブのインデックスから検索対象情報を収集（zipは開かない）"""
+    entries = []
+    for name, info in sorted(doc_store.load_archive_index(doc_root).items()):
+        title = info.get('title') or name
+        summary = info.get('summary', '')
+        entries.append({
+            'title': title,
+            'path': name,
+            'summary': summary,
+            'tokens': tokenize_for_search(' '.join([title, name, summary] + info.get('headings', []))),
+            'title_tokens': tokenize_for_search(title),
+            'archived': True,
+        })
+    return entries
+
+
+def build_search_index(doc_root: Path, markdown_files: List[Path]) -> Path:
+    """
+    横断検索用のインデックスを生成
+    docs.js（件数・分割数のみ）、docs-NNN.js（ドキュメント一覧の分割）、
+    shard-NNN.js（トークン→差分符号化したドキュメントID列、タイトル中のトークンは別に保持）を出力する。
+    file:// でも読み込めるよう、JSONではなくコールバック呼び出し形式のスクリプトとして書き出す。
+    アーカイブ済みドキュメントも .archive/index.json の情報で検索対象に含める（a: 1 で区別）。
+    """
+    entries = [collect_search_entry(md_file, doc_root) for md_file in sorted(markdown_files)]
+    entries += collect_archived_entries(doc_root)
+    shard_count = decide_shard_count(len(entries))
+
+    shards: List[Dict[str, List[int]]] = [{} for _ in range(shard_count)]
+    title_shards: List[Dict[str, List[int]]] = [{} for _ in range(shard_count)]
+    for doc_id, entry in enumerate(entries):
+        for token in set(entry['tokens']):
+            shards[search_shard_of(token, shard_count)].setdefault(token, []).append(doc_id)
+        for token in set(entry['title_tokens']):
+            title_shards[search_shard_of(token, shard_count)].setdefault(token, []).append(doc_id)
+
+    index_dir = doc_root / doc_store.SEARCH_INDEX_DIR
+    index_dir.mkdir(exist_ok=True)
+    for stale in list(index_dir.glob('shard-*')) + list(index_dir.glob('docs-*')):
+        stale.unlink()
+
+    for shard_id in range(shard_count):
+        write_search_script(
+            index_dir / f'shard-{shard_id:03d}.js', '__docSearchShard',
+            [shard_id, encode_postings(shards[shard_id]), encode_postings(title_shards[shard_id])]
+        )
+
+    docs = [
+        {'t': e['title'], 'p': e['path'], 's': e['summary'][:SUMMARY_MAX_LENGTH], **({'a': 1} if e.get('archived') else {})}
+        for e in entries
+    ]
+    chunk_count = max(1, math.ceil(len(docs) / SEARCH_DOCS_CHUNK_SIZE))
+    for chunk_id in range(chunk_count):
+        chunk = docs[chunk_id * SEARCH_DOCS_CHUNK_SIZE:(chunk_id + 1) * SEARCH_DOCS_CHUNK_SIZE]
+        write_search_script(index_dir / f'docs-{chunk_id:03d}.js', '__docSearchDocs', [chunk_id, chunk])
+
+    meta = {
+        'version': 2,
+        'shards': shard_count,
+        'count': len(docs),
+        'chunk': SEARCH_DOCS_CHUNK_SIZE,
+    }
+    write_search_script(index_dir / 'docs.js', '__docSearchMeta', [meta])
+
+    index_page = doc_root / 'index.html'
+    doc_store.atomic_write_text(index_page, get_index_page_template().format(index_dir=doc_store.SEARCH_INDEX_DIR))
+
+    return index_page
+
+
+def encode_postings(postings: Dict[str, List[int]]) -> Dict[str, List[int]]:
+    """昇順のドキュメントIDを差分で保持してサイズを抑える"""
+    return {
+        token: [doc_ids[0]] + [b - a for a, b in zip(doc_ids, doc_ids[1:])]
+        for token, doc_ids in postings.items()
+    }
+
+
+def write_search_script(output_file: Path, callback: str, args: List) -> None:
+    """インデックスデータをコールバック呼び出しのJSとして書き出し（キー順固定で差分を安定させる）"""
+    payload = ','.join(json.dumps(a, ensure_ascii=False, sort_keys=True, separators=(',', ':')) for a in args)
+    doc_store.atomic_write_text(output_file, f'window.{callback}({payload});\n')
+
+
+def get_index_page_template() -> str:
+    """横断検索ページのHTMLテンプレートを取得"""
+    return '''<!DOCTYPE html>
+<html lang="ja">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>ドキュメント一覧</title>
+    <style>
+:root {{
+    --bg-primary: #1e1e1e;
+    --bg-secondary: #252526;
+    --bg-tertiary: #2d2d30;
+    --text-primary: #d4d4d4;
+    --text-secondary: #9e9e9e;
+    --accent: #569cd6;
+    --accent-hover: #4a8bc2;
+    --border: #3e3e42;
+}}
+
+* {{
+    box-sizing: border-box;
+}}
+
+body {{
+    margin: 0;
+    font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+    background: var(--bg-primary);
+    color: var(--text-primary);
+    line-height: 1.6;
+}}
+
+.content {{
+    max-width: 960px;
+    margin: 0 auto;
+    padding: 2rem 3rem;
+}}
+
+h1 {{
+    font-size: 2rem;
+    margin: 0 0 1.5rem 0;
+    border-bottom: 2px solid var(--accent);
+    padding-bottom: 0.5rem;
+}}
+
+.search-box {{
+    width: 100%;
+    padding: 0.75rem 1rem;
+    font-size: 1rem;
+    color: var(--text-primary);
+    background: var(--bg-secondary);
+    border: 1px solid var(--border);
+    border-radius: 6px;
+    outline: none;
+}}
+
+.search-box:focus {{
+    border-color: var(--accent);
+}}
+
+.search-status {{
+    margin: 0.75rem 0 1rem 0;
+    color: var(--text-secondary);
+    font-size: 0.9rem;
+}}
+
+.result-list {{
+    list-style: none;
+    padding: 0;
+    margin: 0;
+}}
+
+.result-item {{
+    padding: 1rem 1.25rem;
+    margin-bottom: 0.75rem;
+    background: var(--bg-secondary);
+    border: 1px solid var(--border);
+    border-radius: 6px;
+}}
+
+.result-item a {{
+    color: var(--accent);
+    text-decoration: none;
+    font-weight: 600;
+}}
+
+.result-item a:hover {{
+    color: var(--accent-hover);
+    text-decoration: underline;
+}}
+
+.result-title {{
+    font-weight: 600;
+}}
+
+.archived-badge {{
+    margin-left: 0.5rem;
+    padding: 0.1rem 0.4rem;
+    font-size: 0.75rem;
+    color: var(--text-secondary);
+    border: 1px solid var(--border);
+    border-radius: 4px;
+}}
+
+.result-path {{
+    font-family: 'Consolas', 'Monaco', monospace;
+    font-size: 0.8rem;
+    color: var(--text-secondary);
+}}
+
+.result-summary {{
+    margin: 0.5rem 0 0 0;
+    font-size: 0.9rem;
+}}
+    </style>
+</head>
+<body>
+    <main class="content">
+        <h1>ドキュメント一覧</h1>
+        <input class="search-box" type="search" placeholder="見出し・概要・パスで検索" autofocus>
+        <div class="search-status"></div>
+        <ul class="result-list"></ul>
+    </main>
+
+    <script>
+(function() {{
+    const INDEX_DIR = '{index_dir}';
+    const TOKEN_PATTERN = /([\\u3040-\\u30ff\\u3400-\\u4dbf\\u4e00-\\u9fff\\uf900-\\ufaff\\uff66-\\uff9f]+)|([0-9a-z_]+)/g;
+    const MAX_RESULTS = 100;
+
+    let meta = null;
+    const loaded = {{shard: {{}}, docs: {{}}}};
+    const waiting = {{shard: {{}}, docs: {{}}}};
+    // 読み込めなかったファイルは空として扱い、検索を止めない
+    const EMPTY = {{shard: {{postings: {{}}, titles: {{}}}}, docs: []}};
+
+    function loadScript(src, onerror) {{
+        const script = document.createElement('script');
+        script.src = src;
+        script.onerror = onerror;
+        document.head.appendChild(script);
+    }}
+
+    function finish(kind, id, data) {{
+        loaded[kind][id] = data;
+        (waiting[kind][id] || []).forEach(resolve => resolve(data));
+        delete waiting[kind][id];
+    }}
+
+    window.__docSearchMeta = function(data) {{
+        meta = data;
+        render(currentQuery());
+    }};
+
+    window.__docSearchShard = function(id, postings, titles) {{
+        finish('shard', id, {{postings: postings, titles: titles}});
+    }};
+
+    window.__docSearchDocs = function(id, docs) {{
+        finish('docs', id, docs);
+    }};
+
+    function loadChunk(kind, id) {{
+        if (loaded[kind][id]) {{
+            return Promise.resolve(loaded[kind][id]);
+        }}
+        return new Promise(resolve => {{
+            if (!waiting[kind][id]) {{
+                waiting[kind][id] = [];
+                loadScript(
+                    INDEX_DIR + '/' + kind + '-' + String(id).padStart(3, '0') + '.js',
+                    () => finish(kind, id, EMPTY[kind])
+                );
+            }}
+            waiting[kind][id].push(resolve);
+        }});
+    }}
+
+    async function getDoc(id) {{
+        const docs = await loadChunk('docs', Math.floor(id / meta.chunk));
+        return docs[id % meta.chunk] || null;
+    }}
+
+    function tokenize(text) {{
+        const tokens = [];
+        for (const m of text.toLowerCase().matchAll(TOKEN_PATTERN)) {{
+            if (m[1]) {{
+                const chars = Array.from(m[1]);
+                if (chars.length === 1) {{
+                    tokens.push(chars[0]);
+                }} else {{
+                    for (let i = 0; i < chars.length - 1; i++) {{
+                        tokens.push(chars[i] + chars[i + 1]);
+                    }}
+                }}
+            }} else if (m[2]) {{
+                tokens.push(m[2]);
+            }}
+        }}
+        return Array.from(new Set(tokens));
+    }}
+
+    function shardOf(token) {{
+        let h = 0x811c9dc5;
+        for (const ch of token) {{
+            h ^= ch.codePointAt(0);
+            h = Math.imul(h, 0x01000193);
+        }}
+        return (h >>> 0) % meta.shards;
+    }}
+
+    function decode(postings) {{
+        const ids = [];
+        let prev = 0;
+        (postings || []).forEach((delta, i) => {{
+            prev = i === 0 ? delta : prev + delta;
+            ids.push(prev);
+        }});
+        return ids;
+    }}
+
+    function intersect(lists) {{
+        return lists.reduce((acc, ids) => {{
+            const set = new Set(ids);
+            return acc.filter(id => set.has(id));
+        }});
+    }}
+
+    async function substringMatches(query) {{
+        // インデックスで拾えない場合のみ、一覧情報を全て読み込んで部分一致で探す
+        const q = query.toLowerCase();
+        const chunkCount = Math.ceil(meta.count / meta.chunk);
+        const chunks = await Promise.all(Array.from({{length: chunkCount}}, (_, i) => loadChunk('docs', i)));
+        const hits = [];
+        const titleHits = new Set();
+        chunks.forEach((docs, chunkId) => {{
+            docs.forEach((doc, i) => {{
+                const id = chunkId * meta.chunk + i;
+                if ((doc.t + ' ' + doc.p + ' ' + doc.s).toLowerCase().includes(q)) {{
+                    hits.push(id);
+                    if (doc.t.toLowerCase().includes(q)) {{
+                        titleHits.add(id);
+                    }}
+                }}
+            }});
+        }});
+        return [hits, titleHits];
+    }}
+
+    async function search(query) {{
+        const tokens = tokenize(query);
+        if (tokens.length === 0) {{
+            return Array.from({{length: meta.count}}, (_, id) => id);
+        }}
+
+        const shards = await Promise.all(tokens.map(token => loadChunk('shard', shardOf(token))));
+
+        // 全トークンを含むドキュメントのみ（AND検索）
+        let hits = intersect(tokens.map((token, i) => decode(shards[i].postings[token])));
+        let titleHits = new Set(intersect(tokens.map((token, i) => decode(shards[i].titles[token]))));
+
+        // 入力途中の単語などインデックスで拾えない場合は一覧情報の部分一致で補う
+        if (hits.length === 0) {{
+            [hits, titleHits] = await substringMatches(query);
+        }}
+
+        // タイトルに含まれるものを先に表示
+        return hits
+            .map(id => [id, titleHits.has(id) ? 1 : 0])
+            .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+            .map(pair => pair[0]);
+    }}
+
+    function escapeHtml(text) {{
+        return text.replace(/[&<>"']/g, c => ({{
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        }})[c]);
+    }}
+
+    const input = document.querySelector('.search-box');
+    const status = document.querySelector('.search-status');
+    const list = document.querySelector('.result-list');
+    let seq = 0;
+
+    function currentQuery() {{
+        return input.value.trim();
+    }}
+
+    async function render(query) {{
+        if (!meta) {{
+            return;
+        }}
+        const mySeq = ++seq;
+        const ids = await search(query);
+        const docs = await Promise.all(ids.slice(0, MAX_RESULTS).map(getDoc));
+        if (mySeq !== seq) {{
+            return;
+        }}
+
+        status.textContent = query
+            ? ids.length + ' 件ヒット（全 ' + meta.count + ' 件）'
+            : '全 ' + meta.count + ' 件';
+        list.innerHTML = docs.filter(doc => doc).map(doc => {{
+            if (doc.a) {{
+                return '<li class="result-item archived">' +
+                    '<span class="result-title">' + escapeHtml(doc.t) + '</span>' +
+                    '<span class="archived-badge">アーカイブ済み</span>' +
+                    '<div class="result-path">archive-doc.py restore ' + escapeHtml(doc.p) + '</div>' +
+                    (doc.s ? '<p class="result-summary">' + escapeHtml(doc.s) + '</p>' : '') +
+                    '</li>';
+            }}
+            return '<li class="result-item">' +
+                '<a href="' + encodeURI(doc.p) + '">' + escapeHtml(doc.t) + '</a>' +
+                '<div class="result-path">' + escapeHtml(doc.p) + '</div>' +
+                (doc.s ? '<p class="result-summary">' + escapeHtml(doc.s) + '</p>' : '') +
+                '</li>';
+        }}).join('');
+    }}
+
+    input.addEventListener('input', () => render(currentQuery()));
+    loadScript(INDEX_DIR + '/docs.js', () => {{
+        status.textContent = '検索インデックスを読み込めません（' + INDEX_DIR + '/docs.js）';
+    }});
+}})();
+    </script>
+</body>
+</html>'''
+
+
+def precompress_file(path: Path, suffixes: List[str]) -> List[Path]:
+    """
+    静的ホスト配信用に .gz / .br を隣に書き出す
+    gzipヘッダのファイル名・mtimeは固定し、同じ入力からは同じバイト列を生成する
+    """
+    data = path.read_bytes()
+    outputs = []
+
+    if '.gz' in suffixes:
+        gz_path = path.with_name(path.name + '.gz')
+        raw = io.BytesIO()
+        with gzip.GzipFile(filename='', mode='wb', fileobj=raw, compresslevel=9, mtime=0) as gz:
+            gz.write(data)
+        doc_store.atomic_write_bytes(gz_path, raw.getvalue())
+        outputs.append(gz_path)
+
+    if '.br' in suffixes and brotli is not None:
+        br_path = path.with_name(path.name + '.br')
+        doc_store.atomic_write_bytes(br_path, brotli.compress(data, quality=11))
+        outputs.append(br_path)
+
+    return outputs
+
+
+def build_bundle(doc_root: Path, bundle_file: Path) -> int:
+    """
+    ドキュメントツリー全体を1つのzipにまとめる
+    zipの中央ディレクトリをランダムアクセス用のインデックスとして使い、
+    エントリ順・タイムスタンプ・パーミッションを固定して再現可能な出力にする
+    """
+    bundle_file = bundle_file.resolve()
+    files = sorted(
+        p for p in doc_root.rglob('*')
+        if p.is_file()
+        and p.resolve() != bundle_file
+        and p.suffix not in ('.gz', '.br')
+        and not any(part.startswith('.') for part in p.relative_to(doc_root).parts)
+    )
+
+    raw = io.BytesIO()
+    with zipfile.ZipFile(raw, 'w') as bundle:
+        for path in files:
+            info = zipfile.ZipInfo(path.relative_to(doc_root).as_posix(), date_time=BUNDLE_DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            bundle.writestr(info, path.read_bytes(), compresslevel=9)
+    doc_store.atomic_write_bytes(bundle_file, raw.getvalue())
+
+    return len(files)
+
+
+def generator_signature() -> str:
+    """このスクリプト自体のハッシュ（テンプレート変更時に変換済み記録を無効化するため）"""
+    return hashlib.sha1(Path(__file__).read_bytes()).hexdigest()
+
+
+def sync_precompressed(path: Path, use_gzip: bool, use_brotli: bool) -> int:
+    """
+    事前圧縮ファイルを元ファイルに合わせる
+    指定された形式に加え、既に存在する .gz / .br も元ファイルより古ければ作り直す
+    （--gzip を付けずに再変換しても、古い圧縮版が配信され続けないようにするため）。
+    brotli モジュールが無く作り直せない .br は削除する。
+    Returns: 書き出したファイル数
+    """
+    source_mtime = path.stat().st_mtime_ns
+    stale = []
+    for suffix, requested in (('.gz', use_gzip), ('.br', use_brotli)):
+        compressed = path.with_name(path.name + suffix)
+        exists = compressed.exists()
+        if not (requested or exists):
+            continue
+        if exists and compressed.stat().st_mtime_ns >= source_mtime:
+            continue
+        if suffix == '.br' and brotli is None:
+            if exists:
+                compressed.unlink()
+            continue
+        stale.append(suffix)
+
+    return len(precompress_file(path, stale)) if stale else 0
+
+
+def search_index_sources(doc_root: Path, markdown_files: List[Path]) -> Dict[str, List[int]]:
+    """検索インデックスの入力（マークダウンとアーカイブのインデックス）の mtime/サイズ"""
+    sources = list(markdown_files)
+    archive_index = doc_root / doc_store.ARCHIVE_DIR_NAME / doc_store.ARCHIVE_INDEX_FILE_NAME
+    if archive_index.exists():
+        sources.append(archive_index)
+    stamps = {}
+    for path in sources:
+        stat = path.stat()
+        stamps[path.relative_to(doc_root).as_posix()] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+def convert_directory(doc_root: Path, markdown_files: List[Path], store_root: Optional[Path],
+                      force: bool = False) -> Tuple[List[Path], bool]:
+    """
+    ディレクトリ内のマークダウンを変換
+    ドキュメントストア内であれば、ストア直下の変換記録を使って前回から変更のないファイルをスキップする
+    Returns: (出力HTML一覧, 1件以上変換・削除があったか)
+    """
+    state = doc_store.load_build_state(store_root) if store_root else {}
+    signature = generator_signature()
+    if force or state.get('generator') != signature:
+        state = {'generator': signature, 'files': {}}
+
+    recorded = state.setdefault('files', {})
+    outputs = []
+    changed = False
+
+    for md_file in sorted(markdown_files):
+        key = md_file.resolve().relative_to(store_root).as_posix() if store_root else None
+        stat = md_file.stat()
+        stamp = [stat.st_mtime_ns, stat.st_size]
+        output_file = md_file.with_suffix('.html')
+
+        print(f"Converting {md_file.relative_to(doc_root).as_posix()}...", end=' ')
+        if key and recorded.get(key) == stamp and output_file.exists():
+            print("- up to date")
+        else:
+            output_file = convert_markdown_to_html(md_file)
+            if key:
+                recorded[key] = stamp
+            changed = True
+            print(f"✓ {output_file.name}")
+        outputs.append(output_file)
+
+    if store_root:
+        # 削除・アーカイブされたドキュメントの記録を消す（他のディレクトリの記録は残す）
+        for key in [k for k in recorded if not (store_root / k).exists()]:
+            del recorded[key]
+            changed = True
+        doc_store.save_build_state(store_root, state)
+
+    return outputs, changed
+
+
 def main():
     """メイン処理"""
-    if len(sys.argv) < 2:
-        print("Usage: python markdown-to-html.py <markdown_file_or_directory>")
-        sys.exit(1)
-
-    input_path = Path(sys.argv[1])
+    parser = argparse.ArgumentParser(description='マークダウンドキュメントをHTML化')
+    parser.add_argument('input', help='マークダウンファイルまたはディレクトリ')
+    parser.add_argument('--search-index', action='store_true',
+                        help='ドキュメントルート配下（<ディレクトリ>/*.md）を一括変換し、横断検索用のインデックスと index.html を生成')
+    parser.add_argument('--gzip', action='store_true',
+                        help='生成した .html/.js の隣に事前圧縮した .gz を書き出す')
+    parser.add_argument('--brotli', action='store_true',
+                        help='.gz に加えて .br も書き出す（--gzip を含む。brotli モジュールが必要）')
+    parser.add_argument('--bundle', metavar='ZIP',
+                        help='変換後のドキュメントツリーを1つのzipアーカイブにまとめる')
+    parser.add_argument('--shared', action='store_true',
+                        help=f'入力パスを worktree 共有ストア（<git common dir>/{doc_store.SHARED_STORE_NAME}）からの相対パスとして扱う')
+    parser.add_argument('--force', action='store_true',
+                        help='変更のないファイルも含めて全て再変換する')
+    args = parser.parse_args()
+
+    if args.brotli and brotli is None:
+        print("Warning: brotli モジュールが見つからないため .br の生成をスキップします", file=sys.stderr)
+    precompress = args.gzip or args.brotli
+
+    input_path = Path(args.input)
+
+    # 環境変数はストアの探索にのみ使い、明示された入力パスは書き換えない
+    if args.shared:
+        store = doc_store.shared_store_dir()
+        if store is None:
+            print("Error: git リポジトリ外のため共有ストアを使用できません")
+            sys.exit(1)
+        input_path = store / input_path
 
     if not input_path.exists():
         print(f"Error: {input_path} does not exist")
         sys.exit(1)
 
-    # ディレクトリの場合は全マークダウンファイルを変換
-    if input_path.is_dir():
-        markdown_files = list(input_path.glob('*.md'))
-        if not markdown_files:
-            print(f"No markdown files found in {input_path}")
-            sys.exit(1)
+    if (args.search_index or args.bundle) and not input_path.is_dir():
+        print("Error: --search-index / --bundle にはディレクトリを指定してください")
+        sys.exit(1)
 
-        print(f"Found {len(markdown_files)} markdown file(s)")
-        for md_file in markdown_files:
-            print(f"Converting {md_file.name}...", end=' ')
-            output_file = convert_markdown_to_html(md_file)
+    # 複数のセッション・worktreeから同時に実行されても出力が混ざらないよう、ストア全体で排他する
+    # （ストア外のファイルは変換記録・ロックを使わない）
+    store_root = doc_store.store_root_of(input_path)
+    lock = doc_store.file_lock(store_root / doc_store.LOCK_FILE_NAME) if store_root else contextlib.nullcontext()
+    with lock:
+        generated = []
+
+        # ディレクトリの場合は全マークダウンファイルを変換
+        if input_path.is_dir():
+            markdown_files = list(input_path.glob('*.md'))
+            if args.search_index:
+                markdown_files += list(input_path.glob('*/*.md'))
+            if not markdown_files:
+                print(f"No markdown files found in {input_path}")
+                sys.exit(1)
+
+            print(f"Found {len(markdown_files)} markdown file(s)")
+            generated, changed = convert_directory(input_path, markdown_files, store_root, force=args.force)
+
+            if args.search_index:
+                print("Building search index...", end=' ')
+                index_page = input_path / 'index.html'
+                # 別の実行で1件ずつ変換されたドキュメントも反映するため、今回の変換有無ではなく
+                # 前回のインデックス生成時の入力と比較する
+                state = doc_store.load_build_state(store_root) if store_root else {}
+                index_key = input_path.resolve().relative_to(store_root).as_posix() if store_root else None
+                sources = search_index_sources(input_path, markdown_files)
+                built = state.get('search_index', {}).get(index_key)
+                if changed or args.force or built != sources or not index_page.exists():
+                    build_search_index(input_path, markdown_files)
+                    if store_root:
+                        state.setdefault('search_index', {})[index_key] = sources
+                        doc_store.save_build_state(store_root, state)
+                    print(f"✓ {index_page.name}")
+                else:
+                    print("- up to date")
+                generated.append(index_page)
+                generated.extend(sorted((input_path / doc_store.SEARCH_INDEX_DIR).glob('*.js')))
+
+        # ファイルの場合は単一変換
+        elif input_path.is_file():
+            if input_path.suffix != '.md':
+                print(f"Error: {input_path} is not a markdown file")
+                sys.exit(1)
+
+            print(f"Converting {input_path.name}...", end=' ')
+            output_file = convert_markdown_to_html(input_path)
+            generated.append(output_file)
             print(f"✓ {output_file.name}")
 
-    # ファイルの場合は単一変換
-    elif input_path.is_file():
-        if input_path.suffix != '.md':
-            print(f"Error: {input_path} is not a markdown file")
-            sys.exit(1)
-
-        print(f"Converting {input_path.name}...", end=' ')
-        output_file = convert_markdown_to_html(input_path)
-        print(f"✓ {output_file.name}")
+        # 既存の圧縮版は --gzip / --brotli の指定が無くても更新する
+        count = sum(
+            sync_precompressed(path, precompress, args.brotli)
+            for path in generated if path.suffix in PRECOMPRESS_SUFFIXES
+        )
+        if precompress or count:
+            print(f"Precompressing... ✓ {count} file(s)")
+
+        if args.bundle:
+            print(f"Bundling into {args.bundle}...", end=' ')
+            count = build_bundle(input_path, Path(args.bundle))
+            print(f"✓ {count} file(s)")
 
     print("\n✨ Conversion complete!")
 
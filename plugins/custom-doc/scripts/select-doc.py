@@ -1,29 +1,13 @@
 #!/usr/bin/env python3
 """
 ドキュメント選択ヘルパースクリプト
-.claude/custom-document/ から対象ドキュメントを検索・選択
+ドキュメントストア（通常は .claude/custom-documents/）から対象ドキュメントを検索・選択
 """
 
 import os
 import sys
-from pathlib import Path
 
-
-def find_custom_document_dir():
-    """現在のディレクトリから.claude/custom-document/を探す"""
-    current = Path.cwd()
-
-    # 上位ディレクトリを最大5階層まで探索
-    for _ in range(5):
-        candidate = current / ".claude" / "custom-document"
-        if candidate.exists() and candidate.is_dir():
-            return candidate
-
-        if current.parent == current:  # ルートディレクトリに到達
-            break
-        current = current.parent
-
-    return None
+import doc_store
 
 
 def get_documents(base_dir, keyword=None):
@@ -31,8 +15,8 @@ def get_documents(base_dir, keyword=None):
     if not base_dir or not base_dir.exists():
         return []
 
-    # ディレクトリのみを抽出（INDEX.md等のファイルは除外）
-    docs = [d for d in base_dir.iterdir() if d.is_dir()]
+    # ディレクトリのみを抽出（INDEX.md等のファイルや検索インデックスは除外）
+    docs = [d for d in base_dir.iterdir() if doc_store.is_document_dir(d)]
 
     # キーワードで絞り込み
     if keyword:
@@ -42,6 +26,16 @@ def get_documents(base_dir, keyword=None):
     return sorted(docs, key=lambda x: x.name)
 
 
+def get_archived_documents(base_dir, keyword):
+    """アーカイブのインデックスからキーワードに一致するドキュメントを取得（zipは開かない）"""
+    matched = [
+        base_dir / name
+        for name, entry in doc_store.load_archive_index(base_dir).items()
+        if doc_store.archive_entry_matches(name, entry, keyword)
+    ]
+    return sorted(matched, key=lambda x: x.name)
+
+
 def select_interactive(docs):
     """インタラクティブな選択"""
     if not docs:
@@ -86,15 +80,34 @@ def main():
     # 引数からキーワードを取得
     keyword = sys.argv[1] if len(sys.argv) > 1 else None
 
-    # custom-documentディレクトリを探す
-    base_dir = find_custom_document_dir()
+    # ドキュメントストアを探す（共有ストアの判定は doc_store に任せる）
+    base_dir = doc_store.find_documents_dir()
     if not base_dir:
-        print("Error: .claude/custom-document/ が見つかりません", file=sys.stderr)
+        print(f"Error: {doc_store.DOCUMENTS_DIR}/ が見つかりません", file=sys.stderr)
         sys.exit(1)
 
     # ドキュメント一覧を取得
     docs = get_documents(base_dir, keyword)
 
+    # アクティブなドキュメントにない場合はアーカイブを検索し、選択されたら復元する
+    if not docs and keyword:
+        archived = get_archived_documents(base_dir, keyword)
+        if archived:
+            print(f"'{keyword}' に一致するアーカイブ済みドキュメントがあります（選択すると復元します）", file=sys.stderr)
+            selected = select_interactive(archived)
+            if not selected:
+                sys.exit(1)
+            try:
+                doc_store.restore_archived_document(base_dir, selected.name)
+            except (ValueError, FileExistsError) as e:
+                print(f"Error: {e}", file=sys.stderr)
+                sys.exit(1)
+            except KeyError:
+                print(f"Error: アーカイブにドキュメントがありません: {selected.name}", file=sys.stderr)
+                sys.exit(1)
+            print(selected.name)
+            sys.exit(0)
+
     # ドキュメントが見つからない場合
     if not docs:
         if keyword:
@@ -4,6 +4,12 @@
 # セッションがcompactingされる前に、カスタムドキュメントの作成/更新を促す
 
 DOC_DIR=".claude/custom-documents"
+# custom-doc の共有ストアが有効な場合は全worktree共通のストアを見る
+case "$(echo "${CUSTOM_DOC_SHARED_STORE:-}" | tr '[:upper:]' '[:lower:]')" in
+    1|true|yes)
+        GIT_COMMON_DIR=$(git rev-parse --git-common-dir 2>/dev/null) && DOC_DIR="$GIT_COMMON_DIR/custom-documents"
+        ;;
+esac
 
 # 変更ファイルがあるかチェック
 CHANGED_FILES=$(git status --porcelain 2>/dev/null | wc -l)
@@ -13,10 +19,21 @@ if [ "$CHANGED_FILES" -eq 0 ]; then
     exit 0
 fi
 
+# compacting後に1回の読み込みで復元できるよう、時間制限付きでスナップショットを書き出す
+# （PRECOMPACT_SNAPSHOT_BUDGET_MS で制限時間を変更可能）
+SNAPSHOT_FILE=""
+if command -v python3 &> /dev/null; then
+    SNAPSHOT_FILE=$(python3 "$(dirname "$0")/write-context-snapshot.py" 2>/dev/null)
+fi
+if [ -n "$SNAPSHOT_FILE" ]; then
+    echo "🗂  コンテキストスナップショットを保存しました: $SNAPSHOT_FILE" >&2
+    echo "" >&2
+fi
+
 # ドキュメントディレクトリが存在するかチェック
 if [ -d "$DOC_DIR" ]; then
-    # ドキュメントがあるか確認
-    DOC_COUNT=$(find "$DOC_DIR" -maxdepth 1 -type d | wc -l)
+    # ドキュメントがあるか確認（.archive 等の隠しディレクトリは除外）
+    DOC_COUNT=$(find "$DOC_DIR" -maxdepth 1 -type d -not -name '.*' | wc -l)
 
     if [ "$DOC_COUNT" -gt 1 ]; then
         # ドキュメントが存在する → update-docを促す
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+compacting前のコンテキストスナップショット出力スクリプト
+変更ファイルの差分統計・変更ディレクトリ・直近のコミット・最も関連するドキュメントを
+時間制限内で収集し、gitディレクトリ内の context-snapshot.json に書き出す
+（作業ツリーに置くと git status が常に汚れ、スナップショット自体が変更ファイルに数えられるため）
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+# 全体の時間制限（ミリ秒）。超過した項目は incomplete に記録して打ち切る
+DEFAULT_BUDGET_MS = 1500
+BUDGET_ENV = 'PRECOMPACT_SNAPSHOT_BUDGET_MS'
+
+SNAPSHOT_FILE_NAME = 'context-snapshot.json'
+
+# custom-doc プラグインの doc_store.py と同じ規則でドキュメントストアを解決する
+DOCUMENTS_DIR = Path('.claude') / 'custom-documents'
+SHARED_STORE_ENV = 'CUSTOM_DOC_SHARED_STORE'
+SHARED_STORE_NAME = 'custom-documents'
+ARCHIVE_INDEX_PATH = Path('.archive') / 'index.json'
+
+RECENT_COMMIT_COUNT = 10
+SUMMARY_MAX_LENGTH = 300
+
+
+class Budget:
+    """残り時間の管理"""
+
+    def __init__(self, budget_ms: int):
+        self.started = time.monotonic()
+        self.deadline = self.started + budget_ms / 1000
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def elapsed_ms(self) -> int:
+        return int((time.monotonic() - self.started) * 1000)
+
+
+def run_git(args, budget: Budget):
+    """残り時間をタイムアウトとしてgitを実行（失敗・タイムアウト時はNone）"""
+    if budget.expired():
+        return None
+    try:
+        result = subprocess.run(
+            ['git', '-c', 'core.quotePath=false'] + args, capture_output=True, text=True,
+            timeout=budget.remaining(), check=True
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout
+
+
+def collect_files(budget: Budget):
+    """
+    変更ファイルごとの状態と追加・削除行数
+    Returns: (ファイル一覧, 行数を取得できたか)
+    """
+    status_out = run_git(['status', '--porcelain', '--untracked-files=all'], budget)
+    if status_out is None:
+        return None, False
+
+    files = {}
+    for line in status_out.splitlines():
+        if len(line) < 4:
+            continue
+        path = line[3:].split(' -> ')[-1].strip('"')
+        files[path] = {'path': path, 'status': line[:2].strip(), 'added': None, 'deleted': None}
+
+    numstat_out = run_git(['diff', '--numstat', 'HEAD'], budget)
+    if numstat_out is not None:
+        for line in numstat_out.splitlines():
+            parts = line.split('\t')
+            if len(parts) != 3:
+                continue
+            added, deleted, path = parts
+            path = path.split(' => ')[-1]
+            if path in files:
+                # バイナリファイルは '-' になる
+                files[path]['added'] = int(added) if added.isdigit() else None
+                files[path]['deleted'] = int(deleted) if deleted.isdigit() else None
+
+    return sorted(files.values(), key=lambda f: f['path']), numstat_out is not None
+
+
+def summarize_directories(files):
+    """変更ファイルを含むディレクトリとファイル数"""
+    counts = {}
+    for f in files:
+        directory = os.path.dirname(f['path']) or '.'
+        counts[directory] = counts.get(directory, 0) + 1
+    return [{'path': d, 'files': n} for d, n in sorted(counts.items())]
+
+
+# 別プラグイン（custom-doc）の doc_store.py は import できないため複製している。変更時は両方を揃えること
+def extract_summary(markdown_content: str) -> str:
+    """「概要」セクションの本文をプレーンテキストとして抽出"""
+    match = re.search(r'^##\s+概要\s*$(.*?)(?=^#{1,3}\s|\Z)', markdown_content, re.MULTILINE | re.DOTALL)
+    if not match:
+        return ''
+
+    text = re.sub(r'```.*?```', ' ', match.group(1), flags=re.DOTALL)
+    text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
+    text = re.sub(r'[`*_>#-]', ' ', text)
+    return ' '.join(text.split())
+
+
+def find_documents_dir(budget: Budget):
+    """
+    ドキュメントストアを解決（custom-doc の doc_store.find_documents_dir と同じ規則）
+    共有ストア有効時は <git common dir>/custom-documents、それ以外はリポジトリ直下の .claude/custom-documents
+    """
+    if os.environ.get(SHARED_STORE_ENV, '').lower() in ('1', 'true', 'yes'):
+        common_dir = (run_git(['rev-parse', '--git-common-dir'], budget) or '').strip()
+        return (Path.cwd() / common_dir / SHARED_STORE_NAME).resolve() if common_dir else None
+    toplevel = (run_git(['rev-parse', '--show-toplevel'], budget) or '').strip()
+    return Path(toplevel or Path.cwd()) / DOCUMENTS_DIR
+
+
+def score_document(text: str, paths, directories):
+    """ファイル一致を1点、ディレクトリ一致を0.5点として採点"""
+    matched_files = [p for p in paths if p in text]
+    matched_dirs = [d for d in directories if d + '/' in text]
+    return len(matched_files) + 0.5 * len(matched_dirs), matched_files
+
+
+def find_related_document(files, budget: Budget):
+    """
+    変更ファイルのパスが最も多く記載されているドキュメントを探す
+    アクティブなドキュメントに一致が無ければ、アーカイブのインデックス（概要・見出し）から探す
+    Returns: (結果, 全ドキュメントを走査できたか)
+    """
+    doc_dir_root = find_documents_dir(budget)
+    if doc_dir_root is None or not doc_dir_root.is_dir():
+        return None, not budget.expired()
+
+    paths = [f['path'] for f in files]
+    directories = {os.path.dirname(p) for p in paths if os.path.dirname(p)}
+    best = None
+
+    for doc_dir in sorted(doc_dir_root.iterdir()):
+        if budget.expired():
+            return best, False
+        if not doc_dir.is_dir() or doc_dir.name.startswith('.') or doc_dir.name == 'search-index':
+            continue
+
+        content = '\n'.join(
+            md.read_text(encoding='utf-8', errors='replace') for md in sorted(doc_dir.glob('*.md'))
+        )
+        score, matched_files = score_document(content, paths, directories)
+
+        if score > 0 and (best is None or score > best['score']):
+            best = {
+                'name': doc_dir.name,
+                'path': doc_dir.as_posix() + '/',
+                'score': score,
+                'matched_files': matched_files,
+                'summary': extract_summary(content)[:SUMMARY_MAX_LENGTH],
+            }
+    if best is not None:
+        return best, True
+
+    try:
+        with open(doc_dir_root / ARCHIVE_INDEX_PATH, 'r', encoding='utf-8') as f:
+            archived = json.load(f).get('documents', {})
+    except (OSError, ValueError, AttributeError):
+        archived = {}
+    for name, entry in sorted(archived.items()):
+        if not isinstance(entry, dict):
+            continue
+        text = ' '.join([name, entry.get('title', ''), entry.get('summary', '')] + entry.get('headings', []))
+        score, matched_files = score_document(text, paths, directories)
+        if score > 0 and (best is None or score > best['score']):
+            best = {
+                'name': name,
+                'path': (doc_dir_root / name).as_posix() + '/',
+                'score': score,
+                'matched_files': matched_files,
+                'summary': entry.get('summary', '')[:SUMMARY_MAX_LENGTH],
+                'archived': True,
+            }
+
+    return best, True
+
+
+def write_snapshot(snapshot, snapshot_path: Path) -> None:
+    """一時ファイルに書いてからrenameで置き換え"""
+    fd, tmp_name = tempfile.mkstemp(dir=snapshot_path.parent, prefix='.context-snapshot.', suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    os.replace(tmp_name, snapshot_path)
+
+
+def main():
+    """メイン処理"""
+    try:
+        budget_ms = int(os.environ.get(BUDGET_ENV, DEFAULT_BUDGET_MS))
+    except ValueError:
+        budget_ms = DEFAULT_BUDGET_MS
+    budget = Budget(budget_ms)
+    incomplete = []
+
+    # worktreeごとのgitディレクトリに置く（作業ツリーを汚さない）
+    git_dir = (run_git(['rev-parse', '--absolute-git-dir'], budget) or '').strip()
+    files, has_diffstat = collect_files(budget)
+    if not git_dir or files is None:
+        # gitが使えない・時間切れの場合はスナップショットを書かない
+        sys.exit(1)
+    if not has_diffstat:
+        incomplete.append('diffstat')
+
+    branch = (run_git(['rev-parse', '--abbrev-ref', 'HEAD'], budget) or '').strip() or None
+    log_out = run_git(['log', f'-{RECENT_COMMIT_COUNT}', '--format=%s'], budget)
+    if log_out is None:
+        incomplete.append('recent_commits')
+
+    related, complete = find_related_document(files, budget)
+    if not complete:
+        incomplete.append('related_document')
+
+    snapshot = {
+        'version': 1,
+        'generated_at': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'branch': branch,
+        'files': files,
+        'directories': summarize_directories(files),
+        'recent_commits': log_out.splitlines() if log_out else [],
+        'related_document': related,
+        'incomplete': incomplete,
+        'elapsed_ms': budget.elapsed_ms(),
+    }
+    snapshot_path = Path(git_dir) / SNAPSHOT_FILE_NAME
+    write_snapshot(snapshot, snapshot_path)
+    print(snapshot_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+プロジェクト統計スクリプト
+1回の走査でディレクトリ別のファイル数・行数、言語別の内訳、大きいファイル、
+マニフェスト（package.json / pyproject.toml / go.mod / Dockerfile 等）を収集する。
+結果はディレクトリ単位で .claude/cache/explore-project.json にキャッシュし、
+2回目以降は mtime が変わったディレクトリのみ再走査する。
+"""
+
+import argparse
+import json
+import os
+import posixpath
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import onboarding_common
+
+
+CACHE_PATH = onboarding_common.CACHE_DIR / 'explore-project.json'
+CACHE_VERSION = 2
+
+# キャッシュ自体は走査しない
+EXCLUDED_PREFIX = onboarding_common.CACHE_DIR.as_posix()
+
+# このトップレベルディレクトリ数未満ならプロセスプールを起動せずに走査する
+PARALLEL_DIR_THRESHOLD = 4
+
+READ_CHUNK_SIZE = 1024 * 1024
+
+LANGUAGES = {
+    '.ts': 'TypeScript', '.tsx': 'TypeScript', '.mts': 'TypeScript', '.cts': 'TypeScript',
+    '.js': 'JavaScript', '.jsx': 'JavaScript', '.mjs': 'JavaScript', '.cjs': 'JavaScript',
+    '.vue': 'Vue', '.svelte': 'Svelte', '.py': 'Python', '.go': 'Go', '.rs': 'Rust',
+    '.java': 'Java', '.kt': 'Kotlin', '.swift': 'Swift', '.rb': 'Ruby', '.php': 'PHP',
+    '.cs': 'C#', '.c': 'C', '.h': 'C', '.cpp': 'C++', '.hpp': 'C++', '.cc': 'C++', '.scala': 'Scala',
+    '.sh': 'Shell', '.bash': 'Shell', '.sql': 'SQL', '.graphql': 'GraphQL', '.proto': 'Protocol Buffers',
+    '.html': 'HTML', '.css': 'CSS', '.scss': 'SCSS', '.md': 'Markdown', '.json': 'JSON',
+    '.yml': 'YAML', '.yaml': 'YAML', '.toml': 'TOML',
+}
+LANGUAGE_FILENAMES = {'Dockerfile': 'Dockerfile', 'Makefile': 'Makefile'}
+
+# マニフェストのファイル名と種別
+MANIFESTS = {
+    'package.json': 'npm', 'pnpm-workspace.yaml': 'pnpm', 'pyproject.toml': 'Python',
+    'requirements.txt': 'pip', 'setup.py': 'Python', 'go.mod': 'Go', 'Cargo.toml': 'Cargo',
+    'Gemfile': 'Bundler', 'composer.json': 'Composer', 'pom.xml': 'Maven', 'build.gradle': 'Gradle',
+    'build.gradle.kts': 'Gradle', 'Dockerfile': 'Docker', 'docker-compose.yml': 'Docker Compose',
+    'docker-compose.yaml': 'Docker Compose', 'compose.yaml': 'Docker Compose', 'Makefile': 'Make',
+}
+
+
+# ---------------------------------------------------------------------------
+# 除外判定
+# ---------------------------------------------------------------------------
+
+def list_ignored(root: Path) -> List[str]:
+    """
+    .gitignore で除外される未追跡パス（ディレクトリは末尾 '/'）
+    git管理外なら空（onboarding_common.EXCLUDED_DIRS のみで除外する）
+    """
+    try:
+        result = subprocess.run(
+            ['git', '-c', 'core.quotePath=false', 'ls-files', '-z', '--others', '--ignored',
+             '--exclude-standard', '--directory'],
+            cwd=root, capture_output=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return []
+    return sorted(p for p in result.stdout.decode('utf-8', errors='replace').split('\0') if p)
+
+
+def parent_of(path: str) -> str:
+    """パスの親ディレクトリ（ルートは ''）"""
+    return posixpath.dirname(path.rstrip('/'))
+
+
+# ---------------------------------------------------------------------------
+# 走査（プロセスプールで実行）
+# ---------------------------------------------------------------------------
+
+def detect_language(name: str) -> Optional[str]:
+    """拡張子・ファイル名から言語を判定"""
+    if name in LANGUAGE_FILENAMES or name.startswith('Dockerfile.'):
+        return LANGUAGE_FILENAMES.get(name, 'Dockerfile')
+    return LANGUAGES.get(os.path.splitext(name)[1].lower())
+
+
+def count_lines(path: str) -> Optional[int]:
+    """改行数を数える（先頭チャンクにNULを含むバイナリはNone）"""
+    lines = 0
+    try:
+        with open(path, 'rb') as f:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if b'\0' in chunk[:8192]:
+                return None
+            while chunk:
+                lines += chunk.count(b'\n')
+                chunk = f.read(READ_CHUNK_SIZE)
+    except OSError:
+        return None
+    return lines
+
+
+def scan_directory(root: str, rel: str, mtime: int, ignored: Set[str], previous: Dict[str, List]) -> tuple:
+    """
+    1ディレクトリ直下のエントリを os.scandir で読み取る（再帰しない）
+    mtime/サイズが前回と同じファイルは行数を数え直さない
+    Returns: ({'mtime', 'dirs': [名前], 'files': {名前: [サイズ, 行数, 言語, mtime]}}, 行数を数え直したファイル数)
+    """
+    full = os.path.join(root, rel) if rel else root
+    dirs = []
+    files = {}
+    recounted = 0
+    with os.scandir(full) as entries:
+        for entry in entries:
+            path = f'{rel}/{entry.name}' if rel else entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in onboarding_common.EXCLUDED_DIRS and path + '/' not in ignored and path != EXCLUDED_PREFIX:
+                        dirs.append(entry.name)
+                elif entry.is_file(follow_symlinks=False) and path not in ignored:
+                    stat = entry.stat(follow_symlinks=False)
+                    old = previous.get(entry.name)
+                    if old and old[0] == stat.st_size and old[3] == stat.st_mtime_ns:
+                        files[entry.name] = old
+                    else:
+                        files[entry.name] = [
+                            stat.st_size, count_lines(entry.path), detect_language(entry.name), stat.st_mtime_ns
+                        ]
+                        recounted += 1
+            except OSError:
+                continue
+    return {'mtime': mtime, 'dirs': sorted(dirs), 'files': files}, recounted
+
+
+def load_directory(root: str, rel: str, ignored: Set[str], cached: Dict[str, Dict]) -> tuple:
+    """
+    ディレクトリを読み直し、キャッシュのファイル情報は mtime/サイズが一致する限り再利用する
+    （その場での書き換えはディレクトリの mtime を変えないため、ファイルごとに stat で確認する）
+    Returns: (エントリ, 再走査したか)。読み取れなければ (None, False)
+    """
+    try:
+        mtime = os.stat(os.path.join(root, rel) if rel else root).st_mtime_ns
+    except OSError:
+        return None, False
+    entry = cached.get(rel)
+    try:
+        result, recounted = scan_directory(root, rel, mtime, ignored, entry['files'] if entry else {})
+    except OSError:
+        return None, False
+    return result, entry is None or entry['mtime'] != mtime or recounted > 0
+
+
+def scan_tree(args) -> tuple:
+    """
+    トップレベルディレクトリ配下を走査
+    Returns: ({ディレクトリ: エントリ}, 再走査したディレクトリ数)
+    """
+    root, top, ignored, cached = args
+    result = {}
+    scanned = 0
+    stack = [top]
+    while stack:
+        rel = stack.pop()
+        entry, rescanned = load_directory(root, rel, ignored, cached)
+        if entry is None:
+            continue
+        result[rel] = entry
+        scanned += rescanned
+        stack.extend(f'{rel}/{d}' for d in entry['dirs'])
+    return result, scanned
+
+
+def top_of(path: str) -> str:
+    """パスのトップレベルディレクトリ名"""
+    return path.split('/', 1)[0]
+
+
+def refresh(root: Path, jobs: Optional[int] = None, full: bool = False) -> tuple:
+    """
+    統計を差分更新
+    トップレベルディレクトリごとにプロセスプールで並列に走査する
+    Returns: (キャッシュ, 再走査したディレクトリ数)
+    """
+    cache = {} if full else onboarding_common.load_cache(root, CACHE_PATH, CACHE_VERSION)
+    cached_dirs = cache.get('dirs', {})
+    ignored = list_ignored(root)
+
+    # 除外対象が変わったディレクトリは再走査する
+    for path in set(cache.get('ignored', [])) ^ set(ignored):
+        cached_dirs.pop(parent_of(path), None)
+
+    root_entry, scanned = load_directory(str(root), '', set(ignored), cached_dirs)
+    if root_entry is None:
+        print(f"Error: ディレクトリを読み取れません: {root}", file=sys.stderr)
+        sys.exit(1)
+    dirs = {'': root_entry}
+
+    # トップレベルごとにキャッシュと除外パスを分けて渡す
+    cached_by_top: Dict[str, Dict] = {}
+    for rel, entry in cached_dirs.items():
+        if rel:
+            cached_by_top.setdefault(top_of(rel), {})[rel] = entry
+    ignored_by_top: Dict[str, Set[str]] = {}
+    for path in ignored:
+        ignored_by_top.setdefault(top_of(path), set()).add(path)
+
+    tasks = [
+        (str(root), name, ignored_by_top.get(name, set()), cached_by_top.get(name, {}))
+        for name in dirs['']['dirs']
+    ]
+    results = onboarding_common.map_parallel(scan_tree, tasks, jobs, PARALLEL_DIR_THRESHOLD)
+    for result, count in results:
+        dirs.update(result)
+        scanned += count
+
+    cache = {'version': CACHE_VERSION, 'ignored': ignored, 'dirs': dirs}
+    onboarding_common.save_cache(root, CACHE_PATH, cache)
+    return cache, scanned
+
+
+# ---------------------------------------------------------------------------
+# 集計
+# ---------------------------------------------------------------------------
+
+def summarize(dirs: Dict[str, Dict], depth: int, top: int) -> Dict:
+    """ディレクトリ別（depth 段まで）・言語別の集計、大きいファイル、マニフェスト"""
+    directories: Dict[str, Dict] = {}
+    languages: Dict[str, Dict] = {}
+    largest = []
+    manifests = []
+    total = {'files': 0, 'lines': 0, 'bytes': 0}
+
+    for rel, entry in dirs.items():
+        parts = rel.split('/') if rel else []
+        ancestors = ['/'.join(parts[:i]) or '.' for i in range(min(len(parts), depth) + 1)]
+        buckets = [total] + [
+            directories.setdefault(a, {'files': 0, 'lines': 0, 'bytes': 0, 'languages': {}}) for a in ancestors
+        ]
+        for name, (size, lines, language, _) in entry['files'].items():
+            path = f'{rel}/{name}' if rel else name
+            largest.append((size, path, lines))
+            lines = lines or 0
+            for bucket in buckets:
+                bucket['files'] += 1
+                bucket['lines'] += lines
+                bucket['bytes'] += size
+            if language:
+                stats = languages.setdefault(language, {'files': 0, 'lines': 0})
+                stats['files'] += 1
+                stats['lines'] += lines
+                for bucket in buckets[1:]:
+                    bucket['languages'][language] = bucket['languages'].get(language, 0) + lines
+            if name in MANIFESTS or name.startswith('Dockerfile.'):
+                manifests.append({'path': path, 'type': MANIFESTS.get(name, 'Docker')})
+
+    largest.sort(key=lambda x: (-x[0], x[1]))
+    return {
+        'total': total,
+        'directories': [
+            {
+                'path': path,
+                'files': stats['files'],
+                'lines': stats['lines'],
+                'bytes': stats['bytes'],
+                'languages': [l for l, _ in sorted(stats['languages'].items(), key=lambda x: -x[1])[:3]],
+            }
+            for path, stats in sorted(directories.items())
+            if path != '.'
+        ],
+        'languages': [
+            {'language': l, 'files': s['files'], 'lines': s['lines']}
+            for l, s in sorted(languages.items(), key=lambda x: (-x[1]['lines'], x[0]))
+        ],
+        'largest_files': [{'path': p, 'bytes': size, 'lines': lines} for size, p, lines in largest[:top]],
+        'manifests': sorted(manifests, key=lambda m: (m['path'].count('/'), m['path'])),
+    }
+
+
+def format_size(size: int) -> str:
+    """バイト数を読みやすい単位で表示"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f'{size:.0f}{unit}' if unit == 'B' else f'{size:.1f}{unit}'
+        size /= 1024
+    return f'{size:.1f}GB'
+
+
+def print_summary(summary: Dict) -> None:
+    """explore-project スキルの出力に貼り付けやすいMarkdownで出力"""
+    total = summary['total']
+    print("## プロジェクト統計\n")
+    print(f"**ファイル数**: {total['files']} / **行数**: {total['lines']} / **サイズ**: {format_size(total['bytes'])}\n")
+
+    print("### ディレクトリ別\n")
+    print("| ディレクトリ | ファイル数 | 行数 | 主な言語 |")
+    print("|-------------|-----------|------|---------|")
+    for d in summary['directories']:
+        print(f"| {d['path']}/ | {d['files']} | {d['lines']} | {', '.join(d['languages']) or '-'} |")
+
+    print("\n### 言語別\n")
+    print("| 言語 | ファイル数 | 行数 |")
+    print("|------|-----------|------|")
+    for l in summary['languages']:
+        print(f"| {l['language']} | {l['files']} | {l['lines']} |")
+
+    print("\n### 大きいファイル\n")
+    print("| ファイル | サイズ | 行数 |")
+    print("|---------|-------|------|")
+    for f in summary['largest_files']:
+        print(f"| `{f['path']}` | {format_size(f['bytes'])} | {f['lines'] if f['lines'] is not None else '-'} |")
+
+    print("\n### マニフェスト\n")
+    for m in summary['manifests']:
+        print(f"- `{m['path']}` ({m['type']})")
+    if not summary['manifests']:
+        print("- なし")
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='プロジェクトのファイル数・行数・言語・マニフェストを1回の走査で集計')
+    parser.add_argument('--depth', type=int, default=2, help='ディレクトリ別に集計する段数（デフォルト: 2）')
+    parser.add_argument('--top', type=int, default=10, help='大きいファイルの表示件数（デフォルト: 10）')
+    parser.add_argument('--full', action='store_true', help='キャッシュを使わずに全ディレクトリを再走査する')
+    parser.add_argument('--jobs', type=int, default=None, help='走査の並列プロセス数（デフォルト: CPU数）')
+    parser.add_argument('--json', action='store_true', help='JSONで出力')
+    args = parser.parse_args()
+
+    root = onboarding_common.find_repo_root()
+    cache, rescanned = refresh(root, args.jobs, args.full)
+    print(f"✓ {len(cache['dirs'])} directories ({rescanned} scanned)", file=sys.stderr)
+
+    summary = summarize(cache['dirs'], args.depth, args.top)
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print_summary(summary)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,485 @@
+#!/usr/bin/env python3
+"""
+ファイルインベントリ・キーワード索引スクリプト
+git ls-files のファイル一覧からパス・ディレクトリ・識別子のトークン索引を
+.claude/cache/file-index.sqlite3 に構築し、複数キーワードでの関連ファイル検索を行う。
+PROJECT_REFERENCES.md の用語集（略語・関連ファイル）も検索語の展開に利用する。
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import onboarding_common
+
+
+INDEX_PATH = onboarding_common.CACHE_DIR / 'file-index.sqlite3'
+# キャッシュ自体は索引しない
+EXCLUDED_PREFIX = '.claude/cache/'
+SCHEMA_VERSION = '1'
+
+# load-project-references スキルと同じ優先順位
+GLOSSARY_CANDIDATES = [
+    Path('.claude') / 'PROJECT_REFERENCES.md',
+    Path('PROJECT_REFERENCES.md'),
+    Path('docs') / 'PROJECT_REFERENCES.md',
+    Path('.claude') / 'GLOSSARY.md',
+    Path('GLOSSARY.md'),
+]
+
+# 内容（識別子）を索引する対象
+CONTENT_EXTENSIONS = {
+    '.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs', '.vue', '.svelte', '.py', '.go', '.rs', '.java',
+    '.kt', '.swift', '.rb', '.php', '.cs', '.c', '.h', '.cpp', '.hpp', '.scala', '.sql', '.graphql', '.proto',
+}
+CONTENT_MAX_BYTES = 256 * 1024
+CONTENT_MAX_TOKENS = 2000
+
+# トークンの出現箇所と検索時の重み
+FIELD_BASENAME, FIELD_DIRECTORY, FIELD_CONTENT = 0, 1, 2
+FIELD_WEIGHTS = {FIELD_BASENAME: 5.0, FIELD_DIRECTORY: 3.0, FIELD_CONTENT: 1.0}
+FIELD_LABELS = {FIELD_BASENAME: 'name', FIELD_DIRECTORY: 'dir', FIELD_CONTENT: 'content'}
+GLOSSARY_PATH_WEIGHT = 4.0
+
+IDENTIFIER_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]{2,}')
+SUBWORD_PATTERN = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+')
+WORD_PATTERN = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+# ---------------------------------------------------------------------------
+# トークン化
+# ---------------------------------------------------------------------------
+
+def split_words(text: str) -> List[str]:
+    """キャメル・スネーク・ケバブケースを分解して小文字の単語列にする（元の語も含む）"""
+    words = []
+    for word in WORD_PATTERN.findall(text):
+        words.append(word.lower())
+        subwords = SUBWORD_PATTERN.findall(word)
+        if len(subwords) > 1:
+            words += [w.lower() for w in subwords]
+    compact = re.sub(r'[\W_]+', '', text).lower()
+    if compact and compact not in words:
+        words.append(compact)
+    return words
+
+
+def path_tokens(path: str) -> List[Tuple[str, int]]:
+    """パスからファイル名・ディレクトリ名のトークンを抽出"""
+    parts = path.split('/')
+    stem = os.path.splitext(parts[-1])[0]
+    tokens = {(t, FIELD_BASENAME) for t in split_words(stem)}
+    for directory in parts[:-1]:
+        tokens.update((t, FIELD_DIRECTORY) for t in split_words(directory))
+    return sorted(tokens)
+
+
+def content_tokens(args) -> Tuple[str, List[str]]:
+    """ファイル内の識別子をトークン化（プロセスプールで実行）"""
+    root, path = args
+    if os.path.splitext(path)[1] not in CONTENT_EXTENSIONS:
+        return path, []
+    try:
+        with open(os.path.join(root, path), 'rb') as f:
+            data = f.read(CONTENT_MAX_BYTES)
+    except OSError:
+        return path, []
+    if b'\0' in data:
+        return path, []
+
+    tokens: Dict[str, None] = {}
+    for identifier in IDENTIFIER_PATTERN.findall(data.decode('utf-8', errors='replace')):
+        for token in split_words(identifier):
+            if len(token) >= 3:
+                tokens[token] = None
+        if len(tokens) >= CONTENT_MAX_TOKENS:
+            break
+    return path, list(tokens)
+
+
+def tokenize_contents(root: Path, paths: List[str], jobs: Optional[int]) -> List[Tuple[str, List[str]]]:
+    """複数ファイルの内容をトークン化（一定数以上ならプロセスプールで並列化）"""
+    return onboarding_common.map_parallel(content_tokens, [(str(root), p) for p in paths], jobs, chunksize=64)
+
+
+# ---------------------------------------------------------------------------
+# git
+# ---------------------------------------------------------------------------
+
+def run_git(args: List[str], root: Path) -> Optional[str]:
+    """gitを実行して標準出力を返す（失敗時はNone）"""
+    try:
+        result = subprocess.run(
+            ['git', '-c', 'core.quotePath=false'] + args,
+            cwd=root, capture_output=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.decode('utf-8', errors='replace')
+
+
+def list_files(root: Path) -> List[str]:
+    """.gitignore を尊重したファイル一覧"""
+    out = run_git(['ls-files', '-z', '--cached', '--others', '--exclude-standard'], root)
+    if out is None:
+        print("Error: git ls-files を実行できません（git リポジトリ内で実行してください）", file=sys.stderr)
+        sys.exit(1)
+    return sorted(
+        p for p in set(out.split('\0'))
+        if p and not p.startswith(EXCLUDED_PREFIX) and (root / p).is_file()
+    )
+
+
+def status_paths(root: Path) -> Optional[Set[str]]:
+    """git status で変更・追加・削除されているパス"""
+    status = run_git(['status', '--porcelain', '-z', '--untracked-files=all'], root)
+    if status is None:
+        return None
+
+    paths = set()
+    entries = status.split('\0')
+    i = 0
+    while i < len(entries):
+        entry = entries[i]
+        if len(entry) > 3:
+            paths.add(entry[3:])
+            # リネームは次の要素に元のパスが入る
+            if entry[0] in 'RC':
+                i += 1
+                if i < len(entries) and entries[i]:
+                    paths.add(entries[i])
+        i += 1
+    return {p for p in paths if not p.startswith(EXCLUDED_PREFIX)}
+
+
+def head_diff_paths(root: Path, old_head: str, new_head: str) -> Optional[Set[str]]:
+    """HEAD が移動した場合（checkout・pull等）のコミット間の変更パス"""
+    if old_head == new_head:
+        return set()
+    diff = run_git(['diff', '--name-only', '-z', old_head, new_head], root)
+    if diff is None:
+        return None
+    return {p for p in diff.split('\0') if p}
+
+
+# ---------------------------------------------------------------------------
+# 用語集
+# ---------------------------------------------------------------------------
+
+def find_glossary(root: Path) -> Optional[Path]:
+    """PROJECT_REFERENCES.md / GLOSSARY.md を探す"""
+    for candidate in GLOSSARY_CANDIDATES:
+        if (root / candidate).is_file():
+            return root / candidate
+    return None
+
+
+def parse_glossary(text: str) -> List[Tuple[str, str, str]]:
+    """
+    Markdownテーブルから (用語, 種別, 値) を抽出
+    - 'path': 行内のバッククォート・スラッシュを含むパス
+    - 'alias': パスを含まない行の2列目（略語表の正式名称など、短い語のみ）
+    """
+    entries = []
+    lines = [line.strip() for line in text.splitlines()] + ['']
+    separator = re.compile(r'^\|[\s|:-]+\|$')
+    for line, next_line in zip(lines, lines[1:]):
+        # ヘッダー行（次の行が区切り行）と区切り行は対象外
+        if not line.startswith('|') or separator.match(line) or separator.match(next_line):
+            continue
+        cells = [c.strip() for c in line.strip('|').split('|')]
+        term = re.sub(r'^例:\s*', '', cells[0]).strip('` ')
+        if not term or len(cells) < 2:
+            continue
+
+        paths = []
+        for cell in cells[1:]:
+            paths += re.findall(r'`([^`]+)`', cell)
+            paths += [w for w in re.split(r'[\s,、]+', re.sub(r'`[^`]*`', ' ', cell)) if '/' in w]
+        paths = [re.sub(r'^\./', '', p.strip()) for p in paths if '/' in p or '.' in p]
+
+        if paths:
+            entries += [(term, 'path', p) for p in paths]
+        elif cells[1] and len(cells[1].split()) <= 3:
+            entries.append((term, 'alias', cells[1]))
+    return entries
+
+
+# ---------------------------------------------------------------------------
+# 索引
+# ---------------------------------------------------------------------------
+
+def open_index(root: Path) -> sqlite3.Connection:
+    """索引DBを開く（スキーマが古ければ作り直す）"""
+    index_path = root / INDEX_PATH
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(index_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+
+    row = conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+    if row is None or row[0] != SCHEMA_VERSION:
+        conn.executescript('''
+            DROP TABLE IF EXISTS files;
+            DROP TABLE IF EXISTS tokens;
+            DROP TABLE IF EXISTS glossary;
+            DELETE FROM meta;
+            CREATE TABLE files (id INTEGER PRIMARY KEY, path TEXT UNIQUE, mtime INTEGER, size INTEGER);
+            CREATE TABLE tokens (token TEXT, file_id INTEGER, field INTEGER,
+                                 PRIMARY KEY (token, file_id, field)) WITHOUT ROWID;
+            CREATE INDEX tokens_by_file ON tokens (file_id);
+            CREATE TABLE glossary (term TEXT, kind TEXT, value TEXT);
+        ''')
+        set_meta(conn, 'schema', SCHEMA_VERSION)
+        conn.commit()
+    return conn
+
+
+def get_meta(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else None
+
+
+def set_meta(conn: sqlite3.Connection, key: str, value: str) -> None:
+    conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, value))
+
+
+def reindex_paths(conn: sqlite3.Connection, root: Path, paths: Set[str], jobs: Optional[int]) -> int:
+    """
+    指定パスを再索引（存在しなければ削除）
+    mtime/サイズが前回と同じファイルは内容を読み直さない
+    Returns: 内容を読み直したファイル数
+    """
+    stored = {}
+    for chunk_start in range(0, len(paths), 500):
+        chunk = sorted(paths)[chunk_start:chunk_start + 500]
+        placeholders = ','.join('?' * len(chunk))
+        for file_id, path, mtime, size in conn.execute(
+                f'SELECT id, path, mtime, size FROM files WHERE path IN ({placeholders})', chunk):
+            stored[path] = (file_id, mtime, size)
+
+    stale = []
+    for path in sorted(paths):
+        full = root / path
+        if not full.is_file():
+            if path in stored:
+                remove_file(conn, stored[path][0])
+            continue
+        stat = full.stat()
+        old = stored.get(path)
+        if old and old[1] == stat.st_mtime_ns and old[2] == stat.st_size:
+            continue
+        if old:
+            remove_file(conn, old[0])
+        stale.append((path, stat.st_mtime_ns, stat.st_size))
+
+    contents = dict(tokenize_contents(root, [p for p, _, _ in stale], jobs))
+    for path, mtime, size in stale:
+        cursor = conn.execute('INSERT INTO files (path, mtime, size) VALUES (?, ?, ?)', (path, mtime, size))
+        file_id = cursor.lastrowid
+        rows = [(token, file_id, field) for token, field in path_tokens(path)]
+        rows += [(token, file_id, FIELD_CONTENT) for token in contents.get(path, [])]
+        conn.executemany('INSERT OR IGNORE INTO tokens (token, file_id, field) VALUES (?, ?, ?)', rows)
+
+    return len(stale)
+
+
+def remove_file(conn: sqlite3.Connection, file_id: int) -> None:
+    conn.execute('DELETE FROM tokens WHERE file_id = ?', (file_id,))
+    conn.execute('DELETE FROM files WHERE id = ?', (file_id,))
+
+
+def refresh_glossary(conn: sqlite3.Connection, root: Path) -> None:
+    """用語集が更新されていれば読み直す"""
+    glossary = find_glossary(root)
+    signature = f'{glossary}:{glossary.stat().st_mtime_ns}' if glossary else ''
+    if get_meta(conn, 'glossary') == signature:
+        return
+
+    conn.execute('DELETE FROM glossary')
+    if glossary:
+        entries = parse_glossary(glossary.read_text(encoding='utf-8'))
+        conn.executemany('INSERT INTO glossary (term, kind, value) VALUES (?, ?, ?)',
+                         [(term.lower(), kind, value) for term, kind, value in entries])
+    set_meta(conn, 'glossary', signature)
+
+
+def build(conn: sqlite3.Connection, root: Path, jobs: Optional[int], full: bool = False) -> Tuple[int, int]:
+    """
+    索引を更新
+    初回（または full）は全ファイルを、以降は git status と HEAD の移動分に含まれるファイルのみを対象にする
+    Returns: (対象ファイル数, 内容を読み直したファイル数)
+    """
+    old_head = get_meta(conn, 'head')
+    new_head = (run_git(['rev-parse', 'HEAD'], root) or '').strip() or 'none'
+    dirty = status_paths(root)
+
+    candidates = None
+    if not full and old_head is not None and dirty is not None:
+        moved = head_diff_paths(root, old_head, new_head)
+        if moved is not None:
+            # 前回の索引時点で変更中だったファイルも、元に戻された可能性があるため再確認する
+            candidates = dirty | moved | set(json.loads(get_meta(conn, 'dirty') or '[]'))
+
+    if candidates is None:
+        current = set(list_files(root))
+        indexed = {row[0] for row in conn.execute('SELECT path FROM files')}
+        candidates = current | indexed
+
+    reindexed = reindex_paths(conn, root, candidates, jobs)
+    refresh_glossary(conn, root)
+
+    set_meta(conn, 'head', new_head)
+    set_meta(conn, 'dirty', json.dumps(sorted(dirty or set())))
+    conn.commit()
+    return len(candidates), reindexed
+
+
+# ---------------------------------------------------------------------------
+# 検索
+# ---------------------------------------------------------------------------
+
+def expand_keyword(conn: sqlite3.Connection, keyword: str) -> Tuple[List[str], List[str]]:
+    """
+    キーワードを検索トークンと用語集の関連パスに展開
+    Returns: (トークン一覧, 関連パス一覧)
+    """
+    tokens = set(split_words(keyword))
+    paths = set()
+    lowered = keyword.lower()
+
+    for term, kind, value in conn.execute(
+            'SELECT term, kind, value FROM glossary WHERE term = ? OR instr(term, ?) > 0 OR instr(?, term) > 0',
+            (lowered, lowered, lowered)):
+        if kind == 'path':
+            paths.add(value.rstrip('/'))
+        else:
+            tokens.update(split_words(value))
+    # 逆方向（正式名称 → 略語）も展開する
+    for term, in conn.execute("SELECT term FROM glossary WHERE kind = 'alias' AND lower(value) = ?", (lowered,)):
+        tokens.update(split_words(term))
+
+    return sorted(t for t in tokens if t), sorted(paths)
+
+
+def search(conn: sqlite3.Connection, keywords: List[str], limit: int) -> Dict:
+    """複数キーワードで検索し、一致したキーワード数と重み付きスコアで順位付け"""
+    scores: Dict[int, float] = {}
+    matched_keywords: Dict[int, Set[str]] = {}
+    reasons: Dict[int, Set[str]] = {}
+
+    for keyword in keywords:
+        tokens, glossary_paths = expand_keyword(conn, keyword)
+        keyword_scores: Dict[int, float] = {}
+
+        for token in tokens:
+            # 前方一致（auth → authentication, authService）
+            for file_id, field in conn.execute(
+                    'SELECT file_id, field FROM tokens WHERE token >= ? AND token < ?', (token, token + '\uffff')):
+                weight = FIELD_WEIGHTS[field]
+                if weight > keyword_scores.get(file_id, 0):
+                    keyword_scores[file_id] = weight
+                reasons.setdefault(file_id, set()).add(f'{FIELD_LABELS[field]}:{keyword}')
+
+        for glossary_path in glossary_paths:
+            for file_id, in conn.execute(
+                    'SELECT id FROM files WHERE path = ? OR path >= ? AND path < ?',
+                    (glossary_path, glossary_path + '/', glossary_path + '/\uffff')):
+                keyword_scores[file_id] = max(keyword_scores.get(file_id, 0), GLOSSARY_PATH_WEIGHT)
+                reasons.setdefault(file_id, set()).add(f'glossary:{keyword}')
+
+        for file_id, score in keyword_scores.items():
+            scores[file_id] = scores.get(file_id, 0) + score
+            matched_keywords.setdefault(file_id, set()).add(keyword)
+
+    # 多くのキーワードに一致したファイルを優先
+    ranked = sorted(scores, key=lambda f: (-len(matched_keywords[f]), -scores[f]))
+    paths = {}
+    for chunk_start in range(0, len(ranked[:limit]), 500):
+        chunk = ranked[chunk_start:chunk_start + 500]
+        placeholders = ','.join('?' * len(chunk))
+        paths.update(conn.execute(f'SELECT id, path FROM files WHERE id IN ({placeholders})', chunk))
+
+    results = [
+        {
+            'path': paths[f],
+            'score': round(scores[f], 2),
+            'matched': len(matched_keywords[f]),
+            'reasons': sorted(reasons[f]),
+        }
+        for f in ranked[:limit]
+    ]
+
+    directories: Dict[str, float] = {}
+    for f in ranked[:limit]:
+        directory = os.path.dirname(paths[f]) or '.'
+        directories[directory] = directories.get(directory, 0) + scores[f]
+
+    return {
+        'keywords': keywords,
+        'total': len(ranked),
+        'results': results,
+        'directories': [
+            {'path': d, 'score': round(s, 2)}
+            for d, s in sorted(directories.items(), key=lambda x: -x[1])[:10]
+        ],
+    }
+
+
+def print_search(result: Dict) -> None:
+    """検索結果をMarkdownで出力"""
+    print(f"## 検索結果: {', '.join(result['keywords'])}（{result['total']} 件）\n")
+    print("| ファイル | スコア | 一致 |")
+    print("|---------|--------|------|")
+    for r in result['results']:
+        print(f"| `{r['path']}` | {r['score']} | {', '.join(r['reasons'])} |")
+    if result['directories']:
+        print("\n### 関連ディレクトリ\n")
+        for d in result['directories']:
+            print(f"- `{d['path']}/` ({d['score']})")
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='ファイルインベントリの構築とキーワード検索')
+    parser.add_argument('--jobs', type=int, default=None, help='内容解析の並列プロセス数（デフォルト: CPU数）')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='索引を構築・差分更新')
+    build_parser.add_argument('--full', action='store_true', help='git status に頼らず全ファイルを再確認する')
+
+    search_parser = subparsers.add_parser('search', help='キーワードで関連ファイルを検索')
+    search_parser.add_argument('keywords', nargs='+')
+    search_parser.add_argument('--limit', type=int, default=30, help='表示件数（デフォルト: 30）')
+    search_parser.add_argument('--no-update', action='store_true', help='検索前の差分更新を行わない')
+    search_parser.add_argument('--json', action='store_true', help='JSONで出力')
+
+    args = parser.parse_args()
+    root = onboarding_common.find_repo_root()
+    conn = open_index(root)
+
+    if args.command == 'build':
+        checked, reindexed = build(conn, root, args.jobs, full=args.full)
+        total = conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
+        print(f"✓ {total} files indexed ({checked} checked, {reindexed} re-read)", file=sys.stderr)
+        print(root / INDEX_PATH)
+        return
+
+    if not args.no_update or get_meta(conn, 'head') is None:
+        build(conn, root, args.jobs)
+
+    result = search(conn, args.keywords, args.limit)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print_search(result)
+
+
+if __name__ == '__main__':
+    main()
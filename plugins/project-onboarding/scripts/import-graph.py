@@ -0,0 +1,535 @@
+#!/usr/bin/env python3
+"""
+import依存グラフ構築スクリプト
+TS/JS・Python・Go のimportを解析し、順方向（Dependencies）と逆方向（Dependents）の
+依存グラフを .claude/cache/import-graph.json にキャッシュする。
+2回目以降は mtime/サイズ/ハッシュが変わったファイルのみ再解析する。
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+import onboarding_common
+
+
+CACHE_PATH = onboarding_common.CACHE_DIR / 'import-graph.json'
+CACHE_VERSION = 1
+
+JS_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs', '.mts', '.cts')
+LANGUAGES = {ext: 'js' for ext in JS_EXTENSIONS}
+LANGUAGES.update({'.py': 'python', '.go': 'go'})
+
+JS_IMPORT_PATTERNS = [
+    re.compile(r'''\b(?:import|export)\s+(?:type\s+)?(?:[^'";]*?\s+from\s+)?['"]([^'"]+)['"]'''),
+    re.compile(r'''\brequire\(\s*['"]([^'"]+)['"]\s*\)'''),
+    re.compile(r'''\bimport\(\s*['"]([^'"]+)['"]\s*\)'''),
+]
+PY_FROM_PATTERN = re.compile(r'^[ \t]*from[ \t]+(\.*[\w.]*)[ \t]+import[ \t]+(?:\(([^)]*)\)|([\w \t,*]+))', re.MULTILINE)
+PY_IMPORT_PATTERN = re.compile(
+    r'^[ \t]*import[ \t]+([\w.]+(?:[ \t]+as[ \t]+\w+)?(?:[ \t]*,[ \t]*[\w.]+(?:[ \t]+as[ \t]+\w+)?)*)', re.MULTILINE
+)
+GO_SINGLE_PATTERN = re.compile(r'^\s*import\s+(?:[\w.]+\s+)?"([^"]+)"', re.MULTILINE)
+GO_BLOCK_PATTERN = re.compile(r'^\s*import\s*\((.*?)\)', re.MULTILINE | re.DOTALL)
+GO_BLOCK_LINE_PATTERN = re.compile(r'^\s*(?:[\w.]+\s+)?"([^"]+)"', re.MULTILINE)
+
+
+# ---------------------------------------------------------------------------
+# ファイル列挙
+# ---------------------------------------------------------------------------
+
+def list_repository_files(root: Path) -> List[str]:
+    """リポジトリ内の全ファイル一覧（git管理下なら .gitignore を尊重）"""
+    try:
+        result = subprocess.run(
+            ['git', '-c', 'core.quotePath=false', 'ls-files', '-z', '--cached', '--others', '--exclude-standard'],
+            cwd=root, capture_output=True, check=True
+        )
+        paths = result.stdout.decode('utf-8', errors='replace').split('\0')
+    except (OSError, subprocess.CalledProcessError):
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in onboarding_common.EXCLUDED_DIRS]
+            rel_dir = os.path.relpath(dirpath, root)
+            for filename in filenames:
+                paths.append(filename if rel_dir == '.' else f'{rel_dir}/{filename}'.replace(os.sep, '/'))
+
+    excluded = onboarding_common.EXCLUDED_DIRS
+    return sorted(p for p in paths if p and not any(part in excluded for part in p.split('/')[:-1]))
+
+
+def source_files(paths: List[str]) -> List[str]:
+    """解析対象（対応言語のソース）のみに絞り込み"""
+    return [p for p in paths if os.path.splitext(p)[1] in LANGUAGES and not p.endswith('.d.ts')]
+
+
+# ---------------------------------------------------------------------------
+# import 解析（プロセスプールで実行）
+# ---------------------------------------------------------------------------
+
+def parse_imports(source: str, lang: str) -> List[str]:
+    """ソースからimport指定子を抽出（Pythonの from X import a は 'X:a' 形式）"""
+    specs = []
+    if lang == 'js':
+        for pattern in JS_IMPORT_PATTERNS:
+            specs += pattern.findall(source)
+    elif lang == 'python':
+        for module, grouped, names in PY_FROM_PATTERN.findall(source):
+            for name in (grouped or names).split(','):
+                name = name.split(' as ')[0].strip()
+                if name and name != '*':
+                    specs.append(f'{module}:{name}')
+            specs.append(module)
+        for group in PY_IMPORT_PATTERN.findall(source):
+            specs += [m.split(' as ')[0].strip() for m in group.split(',')]
+    elif lang == 'go':
+        specs += GO_SINGLE_PATTERN.findall(source)
+        for block in GO_BLOCK_PATTERN.findall(source):
+            specs += GO_BLOCK_LINE_PATTERN.findall(block)
+
+    return sorted(set(specs))
+
+
+def parse_file(args) -> tuple:
+    """
+    1ファイルを読み込んでハッシュとimportを返す
+    前回のハッシュと一致する場合（mtimeのみ変化）は解析せず imports を None で返す
+    """
+    root, path, previous_hash = args
+    data = (Path(root) / path).read_bytes()
+    digest = hashlib.sha1(data).hexdigest()
+    if digest == previous_hash:
+        return path, digest, None
+    lang = LANGUAGES[os.path.splitext(path)[1]]
+    return path, digest, parse_imports(data.decode('utf-8', errors='replace'), lang)
+
+
+def parse_files(root: Path, paths: List[tuple], jobs: Optional[int]) -> List[tuple]:
+    """複数ファイル（パス, 前回のハッシュ）を解析（一定数以上ならプロセスプールで並列化）"""
+    return onboarding_common.map_parallel(parse_file, [(str(root), p, h) for p, h in paths], jobs, chunksize=64)
+
+
+# ---------------------------------------------------------------------------
+# ワークスペース解析
+# ---------------------------------------------------------------------------
+
+def load_json_loose(path: Path):
+    """コメントや末尾カンマを含むJSON（tsconfig等）を読み込み"""
+    try:
+        text = path.read_text(encoding='utf-8')
+    except OSError:
+        return None
+    text = re.sub(r'("(?:\\.|[^"\\])*")|//[^\n]*|/\*.*?\*/', lambda m: m.group(1) or '', text, flags=re.DOTALL)
+    text = re.sub(r',(\s*[}\]])', r'\1', text)
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+def read_pnpm_workspace(path: Path) -> List[str]:
+    """pnpm-workspace.yaml の packages を読み込み（YAMLライブラリを使わない簡易解析）"""
+    patterns = []
+    in_packages = False
+    for line in path.read_text(encoding='utf-8').splitlines():
+        if re.match(r'^packages\s*:', line):
+            in_packages = True
+            continue
+        if in_packages:
+            match = re.match(r'^\s+-\s*[\'"]?([^\'"#]+?)[\'"]?\s*(?:#.*)?$', line)
+            if match:
+                patterns.append(match.group(1))
+            elif line.strip() and not line.startswith((' ', '\t')):
+                break
+    return patterns
+
+
+def workspace_patterns(root: Path) -> List[str]:
+    """pnpm / npm・yarn workspaces / lerna / nx のパッケージglobを収集"""
+    patterns = []
+
+    if (root / 'pnpm-workspace.yaml').exists():
+        patterns += read_pnpm_workspace(root / 'pnpm-workspace.yaml')
+
+    package_json = load_json_loose(root / 'package.json') or {}
+    workspaces = package_json.get('workspaces', [])
+    if isinstance(workspaces, dict):
+        workspaces = workspaces.get('packages', [])
+    patterns += workspaces
+
+    lerna = load_json_loose(root / 'lerna.json') or {}
+    patterns += lerna.get('packages', [])
+
+    # nx は workspaceLayout（既定 apps/ libs/）配下の project.json / package.json を対象にする
+    nx = load_json_loose(root / 'nx.json')
+    if nx is not None:
+        layout = nx.get('workspaceLayout', {})
+        patterns += [f"{layout.get('appsDir', 'apps')}/*", f"{layout.get('libsDir', 'libs')}/*"]
+
+    # turbo.json はパッケージを列挙しないため、上記のworkspaces設定に従う
+    return [p for p in dict.fromkeys(patterns) if not p.startswith('!')]
+
+
+def discover_workspace(root: Path, paths: List[str]) -> Dict:
+    """
+    ワークスペースのパッケージ名→ディレクトリ、Goモジュール、Pythonのルートを解決
+    go.mod 等のマーカーはツリーを再走査せず、列挙済みのファイル一覧から探す
+    """
+    packages = {}
+    for pattern in workspace_patterns(root):
+        for pkg_dir in sorted(root.glob(pattern.rstrip('/'))):
+            rel_dir = pkg_dir.relative_to(root).as_posix()
+            manifest = load_json_loose(pkg_dir / 'package.json') or load_json_loose(pkg_dir / 'project.json') or {}
+            name = manifest.get('name')
+            if name:
+                packages[name] = {
+                    'dir': rel_dir,
+                    'entry': manifest.get('source') or manifest.get('module') or manifest.get('main'),
+                }
+
+    go_modules = {}
+    python_roots = {''}
+    for path in paths:
+        rel_dir, filename = posixpath.split(path)
+        if filename == 'go.mod':
+            try:
+                text = (root / path).read_text(encoding='utf-8')
+            except OSError:
+                continue
+            match = re.search(r'^module\s+(\S+)', text, re.MULTILINE)
+            if match:
+                go_modules[match.group(1)] = rel_dir
+        elif filename in ('pyproject.toml', 'setup.py'):
+            base = rel_dir + '/' if rel_dir else ''
+            python_roots.update({rel_dir, base + 'src'})
+
+    aliases = []
+    tsconfig = load_json_loose(root / 'tsconfig.json') or {}
+    options = tsconfig.get('compilerOptions', {})
+    base_url = options.get('baseUrl', '.')
+    for alias, targets in (options.get('paths') or {}).items():
+        aliases.append([alias, [posixpath.normpath(posixpath.join(base_url, t)) for t in targets]])
+
+    return {
+        'packages': packages,
+        'go_modules': go_modules,
+        'python_roots': sorted(python_roots),
+        'ts_aliases': aliases,
+    }
+
+
+# ---------------------------------------------------------------------------
+# import 解決
+# ---------------------------------------------------------------------------
+
+def resolve_js_path(base: str, file_set: Set[str]) -> Optional[str]:
+    """拡張子・index補完を行ってファイルを解決"""
+    base = posixpath.normpath(base)
+    if base in file_set:
+        return base
+    stem = base[:-3] if base.endswith(('.js', '.jsx')) else base
+    for ext in JS_EXTENSIONS:
+        if stem + ext in file_set:
+            return stem + ext
+    for ext in JS_EXTENSIONS:
+        if f'{base}/index{ext}' in file_set:
+            return f'{base}/index{ext}'
+    return None
+
+
+def package_name_of(spec: str) -> str:
+    """import指定子から外部パッケージ名を取得（@scope/name 対応）"""
+    parts = spec.split('/')
+    return '/'.join(parts[:2]) if spec.startswith('@') and len(parts) > 1 else parts[0]
+
+
+def resolve_js(path: str, spec: str, workspace: Dict, file_set: Set[str]):
+    """TS/JSのimportを解決。Returns: (内部ファイル, 外部パッケージ名) のどちらか一方"""
+    if spec.startswith('.'):
+        return resolve_js_path(posixpath.join(posixpath.dirname(path), spec), file_set), None
+
+    for alias, targets in workspace['ts_aliases']:
+        prefix = alias.rstrip('*')
+        if spec == alias or (alias.endswith('*') and spec.startswith(prefix)):
+            rest = spec[len(prefix):] if alias.endswith('*') else ''
+            for target in targets:
+                resolved = resolve_js_path(target.replace('*', rest), file_set)
+                if resolved:
+                    return resolved, None
+
+    name = package_name_of(spec)
+    package = workspace['packages'].get(name)
+    if package is None:
+        return None, name
+
+    pkg_dir = package['dir']
+    sub = spec[len(name):].lstrip('/')
+    if sub:
+        candidates = [f'{pkg_dir}/{sub}', f'{pkg_dir}/src/{sub}']
+    else:
+        candidates = [f"{pkg_dir}/{package['entry']}"] if package['entry'] else []
+        candidates += [f'{pkg_dir}/src/index', f'{pkg_dir}/index']
+    for candidate in candidates:
+        resolved = resolve_js_path(candidate, file_set)
+        if resolved:
+            return resolved, None
+    return None, None
+
+
+def resolve_python(path: str, spec: str, workspace: Dict, file_set: Set[str]):
+    """Pythonのimportを解決（'module:name' は name がサブモジュールの場合のみ解決）"""
+    module, _, name = spec.partition(':')
+
+    if module.startswith('.'):
+        level = len(module) - len(module.lstrip('.'))
+        base_dir = posixpath.dirname(path)
+        for _ in range(level - 1):
+            base_dir = posixpath.dirname(base_dir)
+        rel = module.lstrip('.').replace('.', '/')
+        bases = [posixpath.join(base_dir, rel) if rel else base_dir]
+    else:
+        rel = module.replace('.', '/')
+        bases = [posixpath.join(r, rel) if r else rel for r in workspace['python_roots']]
+
+    for base in bases:
+        targets = [f'{base}/{name}'] if name else [base]
+        for target in targets:
+            for candidate in (f'{target}.py', f'{target}/__init__.py'):
+                if candidate in file_set:
+                    return candidate, None
+    # name がサブモジュールでない場合は、同時に記録した module 側の指定子で解決される
+    if name or module.startswith('.'):
+        return None, None
+    return None, module.split('.')[0]
+
+
+def resolve_go(spec: str, workspace: Dict, go_dirs: Dict[str, List[str]]):
+    """Goのimportをパッケージディレクトリ内のファイル群に解決"""
+    for module, mod_dir in sorted(workspace['go_modules'].items(), key=lambda x: -len(x[0])):
+        if spec == module or spec.startswith(module + '/'):
+            pkg_dir = posixpath.join(mod_dir, spec[len(module):].lstrip('/')).strip('/')
+            return go_dirs.get(pkg_dir, []), None
+    return [], spec
+
+
+def resolve_graph(files: Dict[str, Dict], workspace: Dict) -> tuple:
+    """全ファイルのimportを解決し、順方向・逆方向・外部依存を構築"""
+    file_set = set(files)
+    go_dirs: Dict[str, List[str]] = {}
+    for path in files:
+        if path.endswith('.go') and not path.endswith('_test.go'):
+            go_dirs.setdefault(posixpath.dirname(path), []).append(path)
+
+    forward: Dict[str, List[str]] = {}
+    external: Dict[str, List[str]] = {}
+    for path, entry in files.items():
+        lang = LANGUAGES[os.path.splitext(path)[1]]
+        internal, outside = set(), set()
+        for spec in entry['imports']:
+            if lang == 'js':
+                resolved, ext = resolve_js(path, spec, workspace, file_set)
+                targets = [resolved] if resolved else []
+            elif lang == 'python':
+                resolved, ext = resolve_python(path, spec, workspace, file_set)
+                targets = [resolved] if resolved else []
+            else:
+                targets, ext = resolve_go(spec, workspace, go_dirs)
+            internal.update(t for t in targets if t != path)
+            if ext:
+                outside.add(ext)
+        if internal:
+            forward[path] = sorted(internal)
+        if outside:
+            external[path] = sorted(outside)
+
+    reverse: Dict[str, List[str]] = {}
+    for path, targets in forward.items():
+        for target in targets:
+            reverse.setdefault(target, []).append(path)
+
+    return forward, {k: sorted(v) for k, v in reverse.items()}, external
+
+
+# ---------------------------------------------------------------------------
+# キャッシュ
+# ---------------------------------------------------------------------------
+
+def load_cache(root: Path) -> Dict:
+    """グラフのキャッシュを読み込み（このスクリプトの変更時は空）"""
+    return onboarding_common.load_cache(root, CACHE_PATH, CACHE_VERSION, onboarding_common.parser_signature(__file__))
+
+
+def refresh(root: Path, jobs: Optional[int] = None) -> tuple:
+    """
+    グラフを差分更新
+    mtime/サイズが一致するファイルは再読み込みせず、変わったファイルのみ並列に再解析する
+    （mtimeのみ変わり内容のハッシュが一致するファイルはimportを再利用する）
+    （import解決はファイル一覧・ワークスペース構成に依存するため毎回やり直すが、辞書引きのみで軽量）
+    Returns: (キャッシュ, 再解析したファイル数)
+    """
+    cache = load_cache(root)
+    previous = cache.get('files', {})
+    all_paths = list_repository_files(root)
+
+    files = {}
+    stale = []
+    for path in source_files(all_paths):
+        try:
+            stat = (root / path).stat()
+        except OSError:
+            continue
+        old = previous.get(path)
+        if old and old['mtime'] == stat.st_mtime_ns and old['size'] == stat.st_size:
+            files[path] = old
+        else:
+            files[path] = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'hash': None, 'imports': []}
+            stale.append((path, old['hash'] if old else None))
+
+    parsed = 0
+    for path, digest, imports in parse_files(root, stale, jobs):
+        files[path]['hash'] = digest
+        if imports is None:
+            files[path]['imports'] = previous[path]['imports']
+        else:
+            files[path]['imports'] = imports
+            parsed += 1
+
+    workspace = discover_workspace(root, all_paths)
+    forward, reverse, external = resolve_graph(files, workspace)
+    cache = {
+        'version': CACHE_VERSION,
+        'parser': onboarding_common.parser_signature(__file__),
+        'workspace': workspace,
+        'files': files,
+        'forward': forward,
+        'reverse': reverse,
+        'external': external,
+    }
+    onboarding_common.save_cache(root, CACHE_PATH, cache)
+    return cache, parsed
+
+
+# ---------------------------------------------------------------------------
+# 問い合わせ
+# ---------------------------------------------------------------------------
+
+def package_of(path: str, workspace: Dict) -> Optional[str]:
+    """ファイルが属するワークスペースパッケージのディレクトリ"""
+    dirs = [p['dir'] for p in workspace['packages'].values()] + [d for d in workspace['go_modules'].values() if d]
+    matches = [d for d in dirs if path.startswith(d + '/')]
+    return max(matches, key=len) if matches else None
+
+
+def walk(graph: Dict[str, List[str]], start: str, depth: int) -> Dict[str, int]:
+    """幅優先で depth 段までたどり、ファイル→距離を返す（循環参照でも停止する）"""
+    distances = {start: 0}
+    frontier = [start]
+    for level in range(1, depth + 1):
+        next_frontier = []
+        for node in frontier:
+            for neighbor in graph.get(node, []):
+                if neighbor not in distances:
+                    distances[neighbor] = level
+                    next_frontier.append(neighbor)
+        frontier = next_frontier
+    del distances[start]
+    return distances
+
+
+def print_result(title: str, target: str, distances: Dict[str, int], cache: Dict, external: List[str]) -> None:
+    """距離・パッケージ別に結果を出力"""
+    workspace = cache['workspace']
+    print(f"# {title}: `{target}`\n")
+    for level in sorted(set(distances.values())):
+        label = '直接' if level == 1 else f'間接（{level}段）'
+        nodes = sorted(n for n, d in distances.items() if d == level)
+        print(f"## {label} ({len(nodes)})")
+        for node in nodes:
+            package = package_of(node, workspace)
+            print(f"- {node}" + (f"  [{package}]" if package else ''))
+        print()
+    if external:
+        print(f"## 外部パッケージ ({len(external)})")
+        for name in external:
+            print(f"- {name}")
+        print()
+    if not distances and not external:
+        print("（該当なし）")
+
+
+def normalize_target(root: Path, target: str) -> str:
+    """引数のパスをリポジトリルートからの相対パスに変換"""
+    path = Path(target)
+    if not path.is_absolute():
+        path = Path.cwd() / path
+    try:
+        return path.resolve().relative_to(root.resolve()).as_posix()
+    except ValueError:
+        return target
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='import依存グラフの構築と問い合わせ')
+    parser.add_argument('--jobs', type=int, default=None, help='解析の並列プロセス数（デフォルト: CPU数）')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('build', help='グラフを構築・差分更新')
+    for name, help_text in (('deps', 'ファイルがimportしているもの'), ('dependents', 'ファイルをimportしているもの')):
+        query = subparsers.add_parser(name, help=help_text)
+        query.add_argument('file')
+        query.add_argument('--depth', type=int, default=1, help='たどる段数（デフォルト: 1）')
+        query.add_argument('--refresh', action='store_true', help='問い合わせ前にグラフを差分更新する')
+        query.add_argument('--json', action='store_true', help='JSONで出力')
+
+    args = parser.parse_args()
+    root = onboarding_common.find_repo_root()
+
+    if args.command == 'build':
+        cache, parsed = refresh(root, args.jobs)
+        edges = sum(len(v) for v in cache['forward'].values())
+        print(f"✓ {len(cache['files'])} files, {edges} edges "
+              f"({parsed} parsed, {len(cache['workspace']['packages'])} workspace packages)", file=sys.stderr)
+        print(root / CACHE_PATH)
+        return
+
+    cache = load_cache(root)
+    if args.refresh or not cache:
+        cache, _ = refresh(root, args.jobs)
+
+    target = normalize_target(root, args.file)
+    if target not in cache['files']:
+        print(f"Error: グラフに含まれないファイルです: {target}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == 'deps':
+        distances = walk(cache['forward'], target, args.depth)
+        external = cache['external'].get(target, [])
+        title = 'Dependencies'
+    else:
+        distances = walk(cache['reverse'], target, args.depth)
+        external = []
+        title = 'Dependents'
+
+    if args.json:
+        print(json.dumps({
+            'file': target,
+            'results': [
+                {'path': p, 'depth': d, 'package': package_of(p, cache['workspace'])}
+                for p, d in sorted(distances.items(), key=lambda x: (x[1], x[0]))
+            ],
+            'external': external,
+        }, ensure_ascii=False, indent=2))
+    else:
+        print_result(title, target, distances, cache, external)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+project-onboarding スクリプト共通処理
+リポジトリルートの解決、除外ディレクトリ、キャッシュの読み書き、プロセスプールでの並列実行を提供
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+# 各スクリプトのキャッシュの置き場所
+CACHE_DIR = Path('.claude') / 'cache'
+
+# .gitignore に関係なく（またはgit管理外の走査で）除外するディレクトリ
+EXCLUDED_DIRS = {'node_modules', 'vendor', 'dist', 'build', '.git', '.next', '__pycache__', '.venv', 'venv'}
+
+# このタスク数未満ならプロセスプールを起動せずに実行する（ファイル単位の処理の既定値）
+PARALLEL_THRESHOLD = 200
+
+
+def find_repo_root() -> Path:
+    """gitのトップレベル（git管理外ならカレントディレクトリ）"""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--show-toplevel'], capture_output=True, text=True, check=True
+        )
+        return Path(result.stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return Path.cwd()
+
+
+def parser_signature(script: str) -> str:
+    """スクリプト自体のハッシュ（解析ロジック変更時にキャッシュを無効化するため）"""
+    return hashlib.sha1(Path(script).read_bytes()).hexdigest()
+
+
+def load_cache(root: Path, cache_path: Path, version: int, parser: Optional[str] = None) -> Dict:
+    """キャッシュを読み込み（バージョン・解析ロジック不一致、破損時は空）"""
+    try:
+        with open(root / cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get('version') != version:
+        return {}
+    if parser is not None and cache.get('parser') != parser:
+        return {}
+    return cache
+
+
+def save_cache(root: Path, cache_path: Path, cache: Dict) -> None:
+    """一時ファイルに書いてからrenameで置き換え"""
+    cache_path = root / cache_path
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, prefix=f'.{cache_path.stem}.', suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    os.replace(tmp_name, cache_path)
+
+
+def map_parallel(func: Callable, tasks: List, jobs: Optional[int],
+                 threshold: int = PARALLEL_THRESHOLD, chunksize: int = 1) -> List:
+    """タスクを実行（threshold 以上かつ jobs != 1 ならプロセスプールで並列化）"""
+    if len(tasks) < threshold or jobs == 1:
+        return [func(t) for t in tasks]
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(func, tasks, chunksize=chunksize))
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+フェーズ計画スクリプト
+サブタスク（関連ファイル・依存関係付き）から競合グラフを構築し、
+同じフェーズで同じファイルやimportで繋がるファイルを触らないようにフェーズを割り当てる。
+出力は task-splitter スキルの出力フォーマット（Markdown）に従う。
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+
+# project-onboarding の import-graph.py が出力するキャッシュ（リポジトリルートからの相対パス）
+IMPORT_GRAPH_PATH = Path('.claude') / 'cache' / 'import-graph.json'
+
+# SKILL.md の制約（超過時は注意事項に記載する）
+MAX_PHASES = 5
+MAX_SUBTASKS = 20
+MAX_FILES_PER_SUBTASK = 5
+
+
+class PlanError(Exception):
+    """入力不備・循環依存"""
+
+
+def string_list(subtask: Dict, key: str, sid: str) -> List[str]:
+    """サブタスクの文字列リスト項目（files / depends_on）を検証して取得"""
+    value = subtask.get(key, [])
+    if not isinstance(value, list) or not all(isinstance(v, (str, int)) and not isinstance(v, bool) for v in value):
+        raise PlanError(f'{sid} の {key} は文字列の配列で指定してください')
+    return [str(v) for v in value]
+
+
+def load_subtasks(data: Dict) -> List[Dict]:
+    """入力JSONのサブタスクを検証して正規化"""
+    if not isinstance(data, dict):
+        raise PlanError('入力は subtasks を持つオブジェクトで指定してください')
+    subtasks = data.get('subtasks')
+    if not isinstance(subtasks, list) or not subtasks:
+        raise PlanError('subtasks が空です')
+
+    normalized = []
+    seen = set()
+    for i, subtask in enumerate(subtasks):
+        if not isinstance(subtask, dict):
+            raise PlanError(f'subtasks の {i + 1} 番目がオブジェクトではありません')
+        sid = str(subtask.get('id', i + 1))
+        if sid in seen:
+            raise PlanError(f'サブタスクIDが重複しています: {sid}')
+        seen.add(sid)
+        normalized.append({
+            'id': sid,
+            'title': str(subtask.get('title', sid)),
+            'files': sorted(set(string_list(subtask, 'files', sid))),
+            'depends_on': string_list(subtask, 'depends_on', sid),
+            'estimate': str(subtask.get('estimate', '')),
+        })
+
+    for subtask in normalized:
+        unknown = [d for d in subtask['depends_on'] if d not in seen]
+        if unknown:
+            raise PlanError(f"{subtask['id']} の依存先が存在しません: {', '.join(unknown)}")
+    return normalized
+
+
+def find_repo_root() -> Path:
+    """gitのトップレベル（git管理外ならカレントディレクトリ）"""
+    try:
+        result = subprocess.run(
+            ['git', 'rev-parse', '--show-toplevel'], capture_output=True, text=True, check=True
+        )
+        return Path(result.stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return Path.cwd()
+
+
+def load_import_graph(path: Optional[Path], root: Path) -> Dict[str, List[str]]:
+    """
+    import-graph.py のキャッシュから順方向の依存を読み込み
+    無い・読めない場合は警告して空（同一ファイルの競合のみで計画する）
+    """
+    path = path or root / IMPORT_GRAPH_PATH
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            forward = json.load(f).get('forward', {})
+    except (OSError, ValueError, AttributeError):
+        print(f"Warning: import依存グラフ（{path}）を読み込めないため、同一ファイルの競合のみを考慮します",
+              file=sys.stderr)
+        return {}
+    return forward if isinstance(forward, dict) else {}
+
+
+def build_conflicts(subtasks: List[Dict], imports: Dict[str, List[str]]) -> Dict[str, Dict[str, str]]:
+    """
+    同じフェーズに置けないサブタスクの組を求める
+    ファイル→サブタスクの逆引きを使い、全組み合わせの比較を避ける
+    Returns: {id: {相手id: 理由}}
+    """
+    owners: Dict[str, Set[str]] = {}
+    for subtask in subtasks:
+        for path in subtask['files']:
+            owners.setdefault(path, set()).add(subtask['id'])
+
+    conflicts: Dict[str, Dict[str, str]] = {s['id']: {} for s in subtasks}
+
+    def add(a: str, b: str, reason: str) -> None:
+        if a != b:
+            conflicts[a].setdefault(b, reason)
+            conflicts[b].setdefault(a, reason)
+
+    for path, ids in owners.items():
+        ids = sorted(ids)
+        for i, a in enumerate(ids):
+            for b in ids[i + 1:]:
+                add(a, b, f'同一ファイル `{path}`')
+
+    for path, ids in owners.items():
+        for imported in imports.get(path, []):
+            for a in ids:
+                for b in owners.get(imported, ()):
+                    add(a, b, f'`{path}` → `{imported}` のimport')
+
+    return conflicts
+
+
+def topological_levels(subtasks: List[Dict]) -> Dict[str, int]:
+    """明示的な依存から最早フェーズ（最長経路）を求める。循環があればエラー"""
+    dependents: Dict[str, List[str]] = {s['id']: [] for s in subtasks}
+    remaining = {s['id']: len(s['depends_on']) for s in subtasks}
+    for subtask in subtasks:
+        for dep in subtask['depends_on']:
+            dependents[dep].append(subtask['id'])
+
+    levels = {sid: 0 for sid, count in remaining.items() if count == 0}
+    queue = list(levels)
+    while queue:
+        sid = queue.pop()
+        for child in dependents[sid]:
+            levels[child] = max(levels.get(child, 0), levels[sid] + 1)
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                queue.append(child)
+
+    cyclic = sorted(sid for sid, count in remaining.items() if count > 0)
+    if cyclic:
+        raise PlanError(f"循環依存が検出されました: {', '.join(cyclic)}")
+    return levels
+
+
+def assign_phases(subtasks: List[Dict], conflicts: Dict[str, Dict[str, str]]) -> Dict[str, int]:
+    """
+    依存の後ろ、かつ競合相手のいない最小のフェーズに割り当てる貪欲法
+    最早フェーズ順・競合数の多い順に処理し（Welsh-Powell）、フェーズ数を抑える
+    """
+    levels = topological_levels(subtasks)
+    by_id = {s['id']: s for s in subtasks}
+    order = sorted(by_id, key=lambda sid: (levels[sid], -len(conflicts[sid]), sid))
+
+    phases: Dict[str, int] = {}
+    members: Dict[int, Set[str]] = {}
+    pending = list(order)
+    while pending:
+        # 依存先が全て割り当て済みのものから処理する
+        for sid in pending:
+            if all(dep in phases for dep in by_id[sid]['depends_on']):
+                break
+        pending.remove(sid)
+
+        phase = max((phases[dep] + 1 for dep in by_id[sid]['depends_on']), default=0)
+        while any(other in members.get(phase, ()) for other in conflicts[sid]):
+            phase += 1
+        phases[sid] = phase
+        members.setdefault(phase, set()).add(sid)
+
+    return phases
+
+
+def plan(data: Dict, imports: Dict[str, List[str]]) -> Dict:
+    """サブタスクをフェーズに割り当て、表示用IDを振る"""
+    subtasks = load_subtasks(data)
+    conflicts = build_conflicts(subtasks, imports)
+    phases = assign_phases(subtasks, conflicts)
+
+    phase_count = max(phases.values()) + 1
+    labels = {}
+    grouped: List[List[Dict]] = []
+    for phase in range(phase_count):
+        members = [s for s in subtasks if phases[s['id']] == phase]
+        for n, subtask in enumerate(members, 1):
+            labels[subtask['id']] = f'{phase + 1}-{n}'
+        grouped.append(members)
+
+    # 依存関係が無いのに競合のために分けられた組（注意事項に記載）
+    depends = {s['id']: set(s['depends_on']) for s in subtasks}
+    separated = []
+    for subtask in subtasks:
+        sid = subtask['id']
+        for other, reason in sorted(conflicts[sid].items()):
+            if sid < other and other not in depends[sid] and sid not in depends[other]:
+                separated.append({'a': labels[sid], 'b': labels[other], 'reason': reason})
+
+    return {
+        'task': data.get('task', ''),
+        'phases': [
+            [
+                {
+                    'label': labels[s['id']],
+                    'id': s['id'],
+                    'title': s['title'],
+                    'files': s['files'],
+                    'depends_on': [labels[d] for d in s['depends_on']],
+                    'estimate': s['estimate'],
+                }
+                for s in members
+            ]
+            for members in grouped
+        ],
+        'separated': separated,
+        'warnings': constraint_warnings(subtasks, phase_count),
+    }
+
+
+def constraint_warnings(subtasks: List[Dict], phase_count: int) -> List[str]:
+    """SKILL.md の制約を超えている項目"""
+    warnings = []
+    if len(subtasks) > MAX_SUBTASKS:
+        warnings.append(f'サブタスク数が {MAX_SUBTASKS} を超えています（{len(subtasks)}）')
+    if phase_count > MAX_PHASES:
+        warnings.append(f'フェーズ数が {MAX_PHASES} を超えています（{phase_count}）')
+    for subtask in subtasks:
+        if len(subtask['files']) > MAX_FILES_PER_SUBTASK:
+            warnings.append(f"{subtask['id']} の関連ファイルが {MAX_FILES_PER_SUBTASK} を超えています")
+    return warnings
+
+
+def format_files(files: List[str], root: Path) -> str:
+    """関連ファイル列（リポジトリに存在しないファイルは新規として表示）"""
+    return ', '.join(f'`{f}`' + ('' if (root / f).exists() else '(新規)') for f in files) or '-'
+
+
+def print_markdown(result: Dict, root: Path) -> None:
+    """task-splitter スキルの出力フォーマットで出力"""
+    print("# タスク分割結果\n")
+    if result['task']:
+        print(f"## 元タスク\n\n{result['task']}\n")
+
+    print("## サブタスク一覧\n")
+    for phase, members in enumerate(result['phases'], 1):
+        if phase == 1:
+            print("### Phase 1（並列実行可能）\n")
+            print("| ID | タスク | 関連ファイル | 見積もり |")
+            print("|----|--------|-------------|---------|")
+            for s in members:
+                print(f"| {s['label']} | {s['title']} | {format_files(s['files'], root)} | {s['estimate'] or '-'} |")
+        else:
+            print(f"### Phase {phase}（Phase {phase - 1}完了後）\n")
+            print("| ID | タスク | 関連ファイル | 依存 |")
+            print("|----|--------|-------------|------|")
+            for s in members:
+                print(f"| {s['label']} | {s['title']} | {format_files(s['files'], root)} | {', '.join(s['depends_on']) or '-'} |")
+        print()
+
+    print("## 実行計画\n")
+    print("```bash")
+    for phase, members in enumerate(result['phases'], 1):
+        if phase > 1:
+            print()
+        prefix = f"# Phase {phase}: " if phase == 1 else f"# Phase {phase}: Phase {phase - 1}完了後、"
+        print(f"{prefix}{len(members)}つのタスクを並列実行")
+        print(', '.join(f"Task({s['label']})" for s in members) + " → 並列")
+    print("```\n")
+
+    if result['separated'] or result['warnings']:
+        print("## 注意事項\n")
+        for item in result['separated']:
+            print(f"- {item['a']} と {item['b']} は{item['reason']}のため別フェーズに配置")
+        for warning in result['warnings']:
+            print(f"- {warning}")
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='サブタスクの競合を避けたフェーズ計画を作成')
+    parser.add_argument('input', nargs='?', help='サブタスク定義のJSON（省略時は標準入力）')
+    parser.add_argument('--import-graph', type=Path, default=None,
+                        help=f'import依存グラフのキャッシュ（デフォルト: <リポジトリルート>/{IMPORT_GRAPH_PATH}）')
+    parser.add_argument('--json', action='store_true', help='JSONで出力')
+    args = parser.parse_args()
+
+    try:
+        if args.input:
+            with open(args.input, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        else:
+            data = json.load(sys.stdin)
+    except (OSError, ValueError) as e:
+        print(f"Error: 入力を読み込めません: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    root = find_repo_root()
+    try:
+        result = plan(data, load_import_graph(args.import_graph, root))
+    except PlanError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print_markdown(result, root)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,557 @@
+#!/usr/bin/env python3
+"""
+プラグインレジストリ構築スクリプト
+.claude-plugin/marketplace.json、各プラグインの plugin.json、commands/*.md と
+skills/*/SKILL.md のフロントマターを検証し、1つのレジストリ
+.claude/cache/plugin-registry.json にまとめる。
+2回目以降は mtime/サイズ/ハッシュが変わったファイルのみ再解析する。
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+REGISTRY_PATH = Path('.claude') / 'cache' / 'plugin-registry.json'
+REGISTRY_VERSION = 1
+MARKETPLACE_PATH = Path('.claude-plugin') / 'marketplace.json'
+PLUGIN_MANIFEST_PATH = Path('.claude-plugin') / 'plugin.json'
+
+# スキルの name / description の制約
+SKILL_NAME_PATTERN = re.compile(r'^[a-z0-9][a-z0-9-]{0,63}$')
+SKILL_DESCRIPTION_MAX_LENGTH = 1024
+
+VERSION_PATTERN = re.compile(r'^\d+\.\d+\.\d+(?:[-+][\w.-]+)?$')
+FRONT_MATTER_PATTERN = re.compile(r'\A---[ \t]*\n(.*?)\n---[ \t]*(?:\n|\Z)', re.DOTALL)
+PLUGIN_ROOT_VARIABLE = '${CLAUDE_PLUGIN_ROOT}'
+
+
+# ---------------------------------------------------------------------------
+# ファイル単位の解析・検証（結果はハッシュと一緒にキャッシュする）
+# ---------------------------------------------------------------------------
+
+def parse_scalar(value: str) -> str:
+    """フロントマターの値（引用符を外す）"""
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
+        return value[1:-1]
+    return value
+
+
+def parse_front_matter(text: str) -> Optional[Dict]:
+    """
+    フロントマターを解析（key: value と「- 要素」のリストのみ対応）
+    フロントマターが無ければNone
+    """
+    match = FRONT_MATTER_PATTERN.match(text)
+    if not match:
+        return None
+
+    data: Dict = {}
+    key = None
+    for line in match.group(1).splitlines():
+        if not line.strip() or line.lstrip().startswith('#'):
+            continue
+        item = re.match(r'^\s+-\s*(.*)$', line)
+        if item and key is not None:
+            if not isinstance(data[key], list):
+                data[key] = []
+            data[key].append(parse_scalar(item.group(1)))
+            continue
+        pair = re.match(r'^([\w-]+)\s*:\s*(.*)$', line)
+        if pair:
+            key = pair.group(1)
+            data[key] = parse_scalar(pair.group(2))
+    return data
+
+
+def tool_list(value) -> List[str]:
+    """allowed-tools をリストに正規化（カンマ区切り文字列も許容）"""
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    value = value.strip()
+    if value.startswith('[') and value.endswith(']'):
+        value = value[1:-1]
+    return [parse_scalar(v) for v in value.split(',') if v.strip()]
+
+
+def parse_json_file(text: str, problems: List[str]) -> Optional[Dict]:
+    """JSONオブジェクトとして読み込み（失敗時は problems に記録してNone）"""
+    try:
+        data = json.loads(text)
+    except ValueError as e:
+        problems.append(f'error: JSONとして読み込めません: {e}')
+        return None
+    if not isinstance(data, dict):
+        problems.append('error: トップレベルがオブジェクトではありません')
+        return None
+    return data
+
+
+def parse_marketplace(text: str, problems: List[str]) -> Optional[Dict]:
+    """marketplace.json の検証"""
+    data = parse_json_file(text, problems)
+    if data is None:
+        return None
+    if not data.get('name'):
+        problems.append('error: name がありません')
+    owner = data.get('owner')
+    if not isinstance(owner, dict) or not owner.get('name'):
+        problems.append('warning: owner.name がありません')
+    plugins = data.get('plugins')
+    if not isinstance(plugins, list):
+        problems.append('error: plugins が配列ではありません')
+        data['plugins'] = []
+        return data
+
+    seen = set()
+    for i, plugin in enumerate(plugins):
+        if not isinstance(plugin, dict):
+            problems.append(f'error: plugins[{i}]: オブジェクトではありません')
+            continue
+        label = plugin.get('name') or f'plugins[{i}]'
+        for field in ('name', 'source'):
+            if not plugin.get(field):
+                problems.append(f'error: {label}: {field} がありません')
+        source = plugin.get('source')
+        if isinstance(source, dict):
+            # github / url 形式はリポジトリ外のため、レジストリには含めない
+            problems.append(f"warning: {label}: source がローカルパスではないため検証できません（{source.get('source', '?')}）")
+        elif source and not isinstance(source, str):
+            problems.append(f'error: {label}: source はパス文字列またはオブジェクトで指定してください')
+        if str(plugin.get('name')) in seen:
+            problems.append(f'error: プラグイン名が重複しています: {label}')
+        seen.add(str(plugin.get('name')))
+        if plugin.get('version') and not VERSION_PATTERN.match(str(plugin['version'])):
+            problems.append(f"warning: {label}: version の形式が不正です: {plugin['version']}")
+    data['plugins'] = [p for p in plugins if isinstance(p, dict)]
+    return data
+
+
+def local_source(entry: Dict) -> Optional[str]:
+    """marketplace のエントリのローカルパス形式の source（github / url 形式などは None）"""
+    source = entry.get('source')
+    return source if isinstance(source, str) and source else None
+
+
+def parse_plugin_manifest(text: str, problems: List[str]) -> Optional[Dict]:
+    """plugin.json の検証"""
+    data = parse_json_file(text, problems)
+    if data is None:
+        return None
+    if not data.get('name'):
+        problems.append('error: name がありません')
+    if not data.get('version'):
+        problems.append('warning: version がありません')
+    elif not VERSION_PATTERN.match(str(data['version'])):
+        problems.append(f"warning: version の形式が不正です: {data['version']}")
+    if not data.get('description'):
+        problems.append('warning: description がありません')
+    return data
+
+
+def parse_command(text: str, problems: List[str]) -> Dict:
+    """commands/*.md のフロントマターの検証"""
+    meta = parse_front_matter(text)
+    if meta is None:
+        problems.append('warning: フロントマターがありません')
+        meta = {}
+    if not meta.get('description'):
+        problems.append('warning: description がありません')
+    return {
+        'description': meta.get('description', ''),
+        'argument_hint': meta.get('argument-hint', ''),
+        'allowed_tools': tool_list(meta.get('allowed-tools')),
+        'model': meta.get('model') or None,
+    }
+
+
+def parse_skill(text: str, problems: List[str]) -> Dict:
+    """SKILL.md のフロントマターの検証"""
+    meta = parse_front_matter(text)
+    if meta is None:
+        problems.append('error: フロントマターがありません')
+        meta = {}
+    name = meta.get('name', '')
+    description = meta.get('description', '')
+    if not name:
+        problems.append('error: name がありません')
+    elif not SKILL_NAME_PATTERN.match(name):
+        problems.append(f'warning: name は小文字英数字とハイフン（64文字以内）にしてください: {name}')
+    if not description:
+        problems.append('error: description がありません')
+    elif len(description) > SKILL_DESCRIPTION_MAX_LENGTH:
+        problems.append(f'warning: description が {SKILL_DESCRIPTION_MAX_LENGTH} 文字を超えています')
+    return {
+        'name': name,
+        'description': description,
+        'version': meta.get('version') or None,
+        'allowed_tools': tool_list(meta.get('allowed-tools')),
+        'user_invocable': meta.get('user-invocable', '').lower() == 'true',
+    }
+
+
+PARSERS = {
+    'marketplace': parse_marketplace,
+    'plugin': parse_plugin_manifest,
+    'command': parse_command,
+    'skill': parse_skill,
+}
+
+
+def load_file(root: Path, rel: str, kind: str, cached: Dict[str, Dict]) -> Tuple[Optional[Dict], bool]:
+    """
+    ファイルを解析（mtime/サイズ、またはハッシュがキャッシュと一致すれば再解析しない）
+    Returns: (エントリ, 再解析したか)。読めなければ (None, False)
+    """
+    try:
+        stat = (root / rel).stat()
+    except OSError:
+        return None, False
+    old = cached.get(rel)
+    if old and old['kind'] == kind and old['mtime'] == stat.st_mtime_ns and old['size'] == stat.st_size:
+        return old, False
+
+    data = (root / rel).read_bytes()
+    digest = hashlib.sha1(data).hexdigest()
+    if old and old['kind'] == kind and old['sha1'] == digest:
+        return dict(old, mtime=stat.st_mtime_ns, size=stat.st_size), False
+
+    problems: List[str] = []
+    parsed = PARSERS[kind](data.decode('utf-8', errors='replace'), problems)
+    return {
+        'kind': kind,
+        'mtime': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'sha1': digest,
+        'data': parsed,
+        'problems': problems,
+    }, True
+
+
+# ---------------------------------------------------------------------------
+# レジストリの構築
+# ---------------------------------------------------------------------------
+
+def find_marketplace_root() -> Optional[Path]:
+    """marketplace.json のあるディレクトリを上に向かって探す"""
+    current = Path.cwd()
+    for directory in (current, *current.parents):
+        if (directory / MARKETPLACE_PATH).is_file():
+            return directory
+    return None
+
+
+def plugin_files(root: Path, source: str) -> List[Tuple[str, str]]:
+    """プラグイン配下の解析対象ファイル [(相対パス, 種別)]"""
+    plugin_dir = (root / source).resolve()
+    files = []
+    if (plugin_dir / PLUGIN_MANIFEST_PATH).is_file():
+        files.append((plugin_dir / PLUGIN_MANIFEST_PATH, 'plugin'))
+    commands_dir = plugin_dir / 'commands'
+    if commands_dir.is_dir():
+        files += [(p, 'command') for p in sorted(commands_dir.glob('*.md'))]
+    skills_dir = plugin_dir / 'skills'
+    if skills_dir.is_dir():
+        files += [(p, 'skill') for p in sorted(skills_dir.glob('*/SKILL.md'))]
+    return [(p.relative_to(root.resolve()).as_posix(), kind) for p, kind in files]
+
+
+def load_hooks(plugin_dir: Path, value, report) -> Dict:
+    """
+    plugin.json の hooks を定義の辞書にする
+    文字列の場合はプラグインからの相対パスの hooks.json（{"hooks": {...}}）を読み込む
+    """
+    if not value:
+        return {}
+    if isinstance(value, str):
+        try:
+            with open(plugin_dir / value, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError) as e:
+            report('error', f'hooks のファイルを読み込めません: {e}')
+            return {}
+        if isinstance(value, dict) and isinstance(value.get('hooks'), dict):
+            value = value['hooks']
+    if not isinstance(value, dict):
+        report('error', 'hooks はオブジェクトまたはファイルパスで指定してください')
+        return {}
+    return value
+
+
+def hook_commands(hooks: Dict, report) -> List[Tuple[str, str]]:
+    """hooks 定義から (イベント, コマンド) を列挙（形式が不正な定義は報告して飛ばす）"""
+    commands = []
+    for event, matchers in hooks.items():
+        if not isinstance(matchers, list):
+            report('error', f'hooks.{event} は配列で指定してください')
+            continue
+        for matcher in matchers:
+            entries = matcher.get('hooks', []) if isinstance(matcher, dict) else None
+            if not isinstance(entries, list):
+                report('error', f'hooks.{event} の定義が不正です')
+                continue
+            for hook in entries:
+                if not isinstance(hook, dict):
+                    report('error', f'hooks.{event} の定義が不正です')
+                elif hook.get('type') == 'command' and isinstance(hook.get('command'), str) and hook['command']:
+                    commands.append((event, hook['command']))
+    return commands
+
+
+def compile_plugin(root: Path, entry: Dict, files: Dict[str, Dict], problems: List[Dict]) -> Dict:
+    """marketplace のエントリとプラグイン配下のファイルから1プラグイン分の情報をまとめる"""
+    source = entry.get('source', '')
+    plugin_dir = (root / source).resolve()
+    prefix = plugin_dir.relative_to(root.resolve()).as_posix() + '/'
+
+    def report(level: str, path: str, message: str) -> None:
+        problems.append({'level': level, 'path': path, 'message': message})
+
+    manifest_rel = prefix + PLUGIN_MANIFEST_PATH.as_posix()
+    manifest = (files.get(manifest_rel) or {}).get('data')
+    if manifest_rel not in files:
+        report('warning', manifest_rel, 'plugin.json がありません')
+    manifest = manifest or {}
+
+    name = entry.get('name', '')
+    if manifest.get('name') and manifest['name'] != name:
+        report('warning', manifest_rel, f"name が marketplace.json と異なります: {manifest['name']} != {name}")
+    if manifest.get('version') and entry.get('version') and str(manifest['version']) != str(entry['version']):
+        report('warning', manifest_rel,
+               f"version が marketplace.json と異なります: {manifest['version']} != {entry['version']}")
+
+    def report_manifest(level: str, message: str) -> None:
+        report(level, manifest_rel, message)
+
+    hooks = []
+    definition = load_hooks(plugin_dir, manifest.get('hooks'), report_manifest)
+    for event, command in hook_commands(definition, report_manifest):
+        hooks.append({'event': event, 'command': command})
+        if command.startswith(PLUGIN_ROOT_VARIABLE):
+            script = plugin_dir / command[len(PLUGIN_ROOT_VARIABLE):].lstrip('/').split()[0]
+            if not script.is_file():
+                report('error', manifest_rel, f'hook のスクリプトがありません: {command}')
+            elif not os.access(script, os.X_OK):
+                report('warning', manifest_rel, f'hook のスクリプトに実行権限がありません: {command}')
+
+    if (plugin_dir / 'SKILL.md').is_file():
+        report('warning', prefix + 'SKILL.md', 'skills/<name>/SKILL.md 以外の SKILL.md は読み込まれません')
+
+    commands = []
+    skills = []
+    for rel in sorted(files):
+        if not rel.startswith(prefix):
+            continue
+        item = files[rel]
+        if item['kind'] == 'command':
+            commands.append(dict(item['data'], name=Path(rel).stem, path=rel))
+        elif item['kind'] == 'skill':
+            skill = dict(item['data'], path=rel)
+            directory = Path(rel).parent.name
+            if skill['name'] and skill['name'] != directory:
+                report('warning', rel, f"name がディレクトリ名と異なります: {skill['name']} != {directory}")
+            skills.append(skill)
+
+    return {
+        'name': name,
+        'source': source,
+        'version': entry.get('version') or manifest.get('version'),
+        'description': entry.get('description') or manifest.get('description', ''),
+        'keywords': manifest.get('keywords', []),
+        'hooks': hooks,
+        'commands': commands,
+        'skills': skills,
+    }
+
+
+def build(root: Path, full: bool = False) -> Tuple[Dict, int]:
+    """
+    レジストリを差分更新
+    Returns: (レジストリ, 再解析したファイル数)
+    """
+    previous = {} if full else load_registry(root)
+    cached = previous.get('files', {})
+    files: Dict[str, Dict] = {}
+    parsed = 0
+
+    def add(rel: str, kind: str) -> Optional[Dict]:
+        nonlocal parsed
+        item, reparsed = load_file(root, rel, kind, cached)
+        if item is not None:
+            files[rel] = item
+            parsed += reparsed
+        return item
+
+    marketplace_rel = MARKETPLACE_PATH.as_posix()
+    marketplace = (add(marketplace_rel, 'marketplace') or {}).get('data') or {'plugins': []}
+
+    problems: List[Dict] = []
+    sources = set()
+    for entry in marketplace['plugins']:
+        source = local_source(entry)
+        if not source:
+            continue
+        if not (root / source).resolve().is_relative_to(root.resolve()):
+            problems.append({'level': 'error', 'path': marketplace_rel,
+                             'message': f"source がリポジトリの外を指しています: {source}"})
+            continue
+        if not (root / source).is_dir():
+            problems.append({'level': 'error', 'path': marketplace_rel,
+                             'message': f"source のディレクトリがありません: {source}"})
+            continue
+        sources.add((root / source).resolve())
+        for rel, kind in plugin_files(root, source):
+            add(rel, kind)
+
+    # 各ファイルの検証結果
+    for rel in sorted(files):
+        for problem in files[rel]['problems']:
+            level, message = problem.split(': ', 1)
+            problems.append({'level': level, 'path': rel, 'message': message})
+
+    plugins = [
+        compile_plugin(root, entry, files, problems)
+        for entry in marketplace['plugins']
+        if local_source(entry) and (root / local_source(entry)).resolve() in sources
+    ]
+
+    plugins_dir = root / 'plugins'
+    if plugins_dir.is_dir():
+        for directory in sorted(plugins_dir.iterdir()):
+            if (directory / PLUGIN_MANIFEST_PATH).is_file() and directory.resolve() not in sources:
+                problems.append({'level': 'warning', 'path': f'plugins/{directory.name}',
+                                 'message': 'marketplace.json に登録されていません'})
+
+    registry = {
+        'version': REGISTRY_VERSION,
+        'parser': parser_signature(),
+        'marketplace': {'name': marketplace.get('name', ''), 'owner': marketplace.get('owner', {})},
+        'plugins': plugins,
+        'problems': problems,
+        'files': files,
+    }
+    # 変更が無ければ書き込まない
+    if registry != previous:
+        save_registry(root, registry)
+    return registry, parsed
+
+
+# ---------------------------------------------------------------------------
+# キャッシュ
+# ---------------------------------------------------------------------------
+
+def parser_signature() -> str:
+    """このスクリプト自体のハッシュ（検証ロジック変更時にキャッシュを無効化するため）"""
+    return hashlib.sha1(Path(__file__).read_bytes()).hexdigest()
+
+
+def load_registry(root: Path) -> Dict:
+    """レジストリを読み込み（バージョン・検証ロジック不一致、破損時は空）"""
+    try:
+        with open(root / REGISTRY_PATH, 'r', encoding='utf-8') as f:
+            registry = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if registry.get('version') != REGISTRY_VERSION or registry.get('parser') != parser_signature():
+        return {}
+    return registry
+
+
+def save_registry(root: Path, registry: Dict) -> None:
+    """一時ファイルに書いてからrenameで置き換え"""
+    registry_path = root / REGISTRY_PATH
+    registry_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=registry_path.parent, prefix='.plugin-registry.', suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    os.replace(tmp_name, registry_path)
+
+
+# ---------------------------------------------------------------------------
+# 出力
+# ---------------------------------------------------------------------------
+
+def print_problems(problems: List[Dict]) -> None:
+    """検証結果を標準エラーに出力"""
+    for problem in problems:
+        print(f"{problem['level']}: {problem['path']}: {problem['message']}", file=sys.stderr)
+
+
+def list_entries(registry: Dict, kind: str) -> List[Dict]:
+    """一覧表示用のエントリ（コマンド・スキルはプラグイン名付き）"""
+    if kind == 'plugins':
+        return [
+            {k: p[k] for k in ('name', 'source', 'version', 'description')}
+            for p in registry['plugins']
+        ]
+    return [
+        dict(item, plugin=plugin['name'])
+        for plugin in registry['plugins']
+        for item in plugin[kind]
+    ]
+
+
+def print_entries(kind: str, entries: List[Dict]) -> None:
+    """一覧をタブ区切りで出力"""
+    for entry in entries:
+        if kind == 'plugins':
+            print(f"{entry['name']}\t{entry['version'] or '-'}\t{entry['description']}")
+        elif kind == 'commands':
+            hint = f" {entry['argument_hint']}" if entry['argument_hint'] else ''
+            print(f"/{entry['name']}{hint}\t{entry['plugin']}\t{entry['description']}")
+        else:
+            print(f"{entry['name']}\t{entry['plugin']}\t{entry['description']}")
+
+
+def main():
+    """メイン処理"""
+    parser = argparse.ArgumentParser(description='マーケットプレイスのプラグイン・コマンド・スキル情報の検証とレジストリ構築')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='レジストリを構築・差分更新して検証結果を表示')
+    build_parser.add_argument('--full', action='store_true', help='キャッシュを使わずに全ファイルを再解析する')
+    build_parser.add_argument('--check', action='store_true', help='error があれば終了コード1で終了する')
+
+    list_parser = subparsers.add_parser('list', help='プラグイン・コマンド・スキルを一覧表示')
+    list_parser.add_argument('kind', nargs='?', choices=('plugins', 'commands', 'skills'), default='commands')
+    list_parser.add_argument('--json', action='store_true', help='JSONで出力')
+
+    args = parser.parse_args()
+
+    root = find_marketplace_root()
+    if root is None:
+        print(f"Error: {MARKETPLACE_PATH} が見つかりません", file=sys.stderr)
+        sys.exit(1)
+
+    if args.command == 'build':
+        registry, parsed = build(root, args.full)
+        print_problems(registry['problems'])
+        errors = sum(1 for p in registry['problems'] if p['level'] == 'error')
+        commands = sum(len(p['commands']) for p in registry['plugins'])
+        skills = sum(len(p['skills']) for p in registry['plugins'])
+        print(f"✓ {len(registry['plugins'])} plugins, {commands} commands, {skills} skills "
+              f"({parsed} parsed, {errors} errors, {len(registry['problems']) - errors} warnings)", file=sys.stderr)
+        print(root / REGISTRY_PATH)
+        if args.check and errors:
+            sys.exit(1)
+        return
+
+    registry, _ = build(root)
+    entries = list_entries(registry, args.kind)
+    if args.json:
+        print(json.dumps(entries, ensure_ascii=False, indent=2))
+    else:
+        print_entries(args.kind, entries)
+
+
+if __name__ == '__main__':
+    main()